@@ -1,15 +1,23 @@
+from collections.abc import Sequence
+from itertools import chain
+from typing import get_args
+
 from fastapi import HTTPException
-from sqlalchemy import delete, func, select
+from pydantic import BaseModel
+from sqlalchemy import Column, ScalarSelect, Select, Table, Text, bindparam, delete, func, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import Load, joinedload, selectinload
 
+from database.dialects import JsonArrayAgg, JsonObject
 from database.models.movies import (
     CertificationModel,
     DirectorModel,
     GenreModel,
+    MovieDirectorsModel,
     MovieGenresModel,
     MovieModel,
+    MovieStarsModel,
     StarModel,
 )
 from schemas.movies import (
@@ -20,15 +28,29 @@ from schemas.movies import (
     GenreReadSchema,
     GenreUpdateSchema,
     MovieCreateSchema,
+    MovieDetailSchema,
     MovieUpdateSchema,
     StarCreateSchema,
     StarUpdateSchema,
 )
 
 
+def movie_relations() -> tuple[Load, ...]:
+    """
+    Loader options for a movie with everything its detail schema shows: one SELECT ... IN per
+    collection, and the certification joined into the movie query since it's many-to-one.
+    """
+    return (
+        selectinload(MovieModel.genres),
+        selectinload(MovieModel.directors),
+        selectinload(MovieModel.stars),
+        joinedload(MovieModel.certification),
+    )
+
+
 async def get_all_genres(
         db: AsyncSession
-) -> list[GenreModel]:
+) -> Sequence[GenreModel]:
 
     """Retrieve all genres from the database, ordered by ID."""
 
@@ -66,7 +88,7 @@ async def get_genre_by_id(
 async def get_movie_by_genre(
         db: AsyncSession,
         genre_id: int
-) -> list[MovieModel]:
+) -> Sequence[MovieModel]:
 
     """Retrieve a single genre by its ID."""
 
@@ -81,7 +103,7 @@ async def get_movie_by_genre(
         )
         .order_by(MovieModel.id.desc())
     )
-    return list(result.scalars().all())
+    return result.scalars().all()
 
 
 async def add_genre(
@@ -140,7 +162,7 @@ async def remove_genre(
 
 async def get_all_stars(
         db: AsyncSession
-) -> list[StarModel]:
+) -> Sequence[StarModel]:
 
     """Retrieve all stars from the database, ordered by ID."""
 
@@ -148,7 +170,7 @@ async def get_all_stars(
         select(StarModel)
         .order_by(StarModel.id)
     )
-    return list(result.scalars().all())
+    return result.scalars().all()
 
 
 async def get_star_by_id(
@@ -228,7 +250,7 @@ async def remove_star(
 
 async def get_all_directors(
         db: AsyncSession
-) -> list[DirectorModel]:
+) -> Sequence[DirectorModel]:
 
     """Retrieve all directors from the database, ordered by ID."""
 
@@ -236,7 +258,7 @@ async def get_all_directors(
         select(DirectorModel)
         .order_by(DirectorModel.id)
     )
-    return list(result.scalars().all())
+    return result.scalars().all()
 
 
 async def get_director_by_id(
@@ -318,7 +340,7 @@ async def remove_director(
 
 async def get_all_certifications(
         db: AsyncSession
-) -> list[CertificationModel]:
+) -> Sequence[CertificationModel]:
 
     """Retrieve all certifications from the database, ordered by ID."""
 
@@ -326,7 +348,7 @@ async def get_all_certifications(
         select(CertificationModel)
         .order_by(CertificationModel.id)
     )
-    return list(result.scalars().all())
+    return result.scalars().all()
 
 
 async def get_certification_by_id(
@@ -412,25 +434,20 @@ async def remove_certification(
 async def get_all_movies(
         db: AsyncSession,
         offset: int, limit: int
-) -> list[MovieModel]:
+) -> Sequence[MovieModel]:
 
     """Retrieve all movies from the database, ordered by ID."""
 
     stmt = (
         select(MovieModel)
-        .options(
-            selectinload(MovieModel.genres),
-            selectinload(MovieModel.directors),
-            selectinload(MovieModel.stars),
-            selectinload(MovieModel.certification)
-        )
+        .options(*movie_relations())
         .offset(offset)
         .limit(limit)
         .order_by(MovieModel.id)
     )
 
     result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return result.scalars().all()
 
 
 async def get_movie_by_id(
@@ -445,17 +462,70 @@ async def get_movie_by_id(
 
     result = await db.execute(
         select(MovieModel)
-        .options(
-            selectinload(MovieModel.genres),
-            selectinload(MovieModel.directors),
-            selectinload(MovieModel.stars),
-            selectinload(MovieModel.certification),
-        )
+        .options(*movie_relations())
         .where(MovieModel.id == movie_id)
     )
     return result.scalar_one_or_none()
 
 
+def _json_items_subquery(
+        model: type[GenreModel | StarModel | DirectorModel],
+        association: Table,
+        fk_column: Column[int],
+        item_schema: type[BaseModel],
+) -> ScalarSelect:
+
+    """Build a correlated JSON array of `item_schema` objects for one movie relationship."""
+
+    item = JsonObject(*chain.from_iterable((name, getattr(model, name)) for name in item_schema.model_fields))
+    return (
+        select(JsonArrayAgg(item))
+        .select_from(association.join(model, model.id == fk_column))
+        .where(association.c.movie_id == MovieModel.id)
+        .scalar_subquery()
+    )
+
+
+def _movie_detail_json_statement() -> Select:
+
+    """
+    Build the SELECT of one movie as a MovieDetailSchema JSON document. The keys come from the
+    schema's fields, with genres, stars and directors as arrays of their item schemas.
+    """
+
+    relations = {
+        "genres": (GenreModel, MovieGenresModel, MovieGenresModel.c.genre_id),
+        "stars": (StarModel, MovieStarsModel, MovieStarsModel.c.star_id),
+        "directors": (DirectorModel, MovieDirectorsModel, MovieDirectorsModel.c.director_id),
+    }
+    fields = []
+    for name, field in MovieDetailSchema.model_fields.items():
+        if name in relations:
+            item_schema = get_args(field.annotation)[0]
+            fields += [name, _json_items_subquery(*relations[name], item_schema)]
+        else:
+            fields += [name, getattr(MovieModel, name)]
+    return select(JsonObject(*fields).cast(Text)).where(MovieModel.id == bindparam("movie_id"))
+
+
+# Built once at import: the document shape only depends on MovieDetailSchema
+_MOVIE_DETAIL_JSON = _movie_detail_json_statement()
+
+
+async def get_movie_detail_json(
+        db: AsyncSession,
+        movie_id: int
+) -> str | None:
+
+    """
+    Retrieve a single movie with its genres, stars and directors as a MovieDetailSchema
+    JSON document built by the database. Returns None if not found.
+    """
+
+    result = await db.execute(_MOVIE_DETAIL_JSON, {"movie_id": movie_id})
+    return result.scalar_one_or_none()
+
+
 async def add_movie(
         db: AsyncSession,
         movie_data: MovieCreateSchema
@@ -471,11 +541,13 @@ async def add_movie(
         )
     )
 
-    genres_result = await db.execute(
-        select(GenreModel)
-        .where(GenreModel.id.in_(movie_data.genre_ids))
-    )
-    genres = genres_result.scalars().all()
+    genres = []
+    if movie_data.genre_ids:
+        genres_result = await db.execute(
+            select(GenreModel)
+            .where(GenreModel.id.in_(movie_data.genre_ids))
+        )
+        genres = genres_result.scalars().all()
     if len(genres) != len(set(movie_data.genre_ids)):
         raise HTTPException(
             status_code=400,
@@ -483,11 +555,13 @@ async def add_movie(
         )
     movie.genres = genres
 
-    stars_result = await db.execute(
-        select(StarModel)
-        .where(StarModel.id.in_(movie_data.star_ids))
-    )
-    stars = stars_result.scalars().all()
+    stars = []
+    if movie_data.star_ids:
+        stars_result = await db.execute(
+            select(StarModel)
+            .where(StarModel.id.in_(movie_data.star_ids))
+        )
+        stars = stars_result.scalars().all()
     if len(stars) != len(set(movie_data.star_ids)):
         raise HTTPException(
             status_code=400,
@@ -495,13 +569,13 @@ async def add_movie(
         )
     movie.stars = stars
 
-    directors_result = await db.execute(
-        select(DirectorModel)
-        .where(DirectorModel.id.in_(movie_data.director_ids))
-
-
-    )
-    directors = directors_result.scalars().all()
+    directors = []
+    if movie_data.director_ids:
+        directors_result = await db.execute(
+            select(DirectorModel)
+            .where(DirectorModel.id.in_(movie_data.director_ids))
+        )
+        directors = directors_result.scalars().all()
     if len(directors) != len(set(movie_data.director_ids)):
         raise HTTPException(
             status_code=400,
@@ -521,12 +595,7 @@ async def add_movie(
         )
     result = await db.execute(
         select(MovieModel)
-        .options(
-            selectinload(MovieModel.genres),
-            selectinload(MovieModel.stars),
-            selectinload(MovieModel.directors),
-            selectinload(MovieModel.certification),
-        )
+        .options(*movie_relations())
         .where(MovieModel.id == movie.id)
     )
     movie_with_relations = result.scalar_one()
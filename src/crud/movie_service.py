@@ -1,9 +1,13 @@
+from collections.abc import Sequence
+from typing import TypeVar
+
 from fastapi import HTTPException
 from sqlalchemy import Select, and_, delete, exists, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from crud import movie_crud
+from database.dialects import dialect_insert
 from database.models import OrderItemModel, UserModel
 from database.models.movies import (
     CertificationModel,
@@ -34,10 +38,30 @@ from schemas.movies import (
     StarUpdateSchema,
 )
 
+_T = TypeVar("_T")
+
+
+def _require(obj: _T | None, label: str) -> _T:
+
+    """
+    Return the object or raise a 404 if it is missing.
+    :param obj: Object loaded from the database or None.
+    :param label: Name of the entity used in the error message.
+    :raises HTTPException: If the object is None.
+    :return: The object itself.
+    """
+
+    if obj is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"{label} not found."
+        )
+    return obj
+
 
 async def list_genres(
         db: AsyncSession
-) -> list[GenreModel]:
+) -> Sequence[GenreModel]:
 
     """
     Retrieve all movie genres from the database.
@@ -51,7 +75,7 @@ async def list_genres(
 async def get_all_movies_by_genre(
         db: AsyncSession,
         genre_id: int
-) -> list[MovieModel]:
+) -> Sequence[MovieModel]:
 
     """
     Get a specific genre by its ID.
@@ -84,12 +108,7 @@ async def get_genre(
     """
 
     genre = await movie_crud.get_genre_by_id(db, genre_id)
-    if not genre:
-        raise HTTPException(
-            status_code=404,
-            detail="Genre not found."
-        )
-    return genre
+    return _require(genre, "Genre")
 
 
 async def create_genre(
@@ -127,12 +146,7 @@ async def update_genre(
         genre_id,
         genre_data
     )
-    if not updated:
-        raise HTTPException(
-            status_code=404,
-            detail="Genre not found."
-        )
-    return updated
+    return _require(updated, "Genre")
 
 
 async def delete_genre(
@@ -159,7 +173,7 @@ async def delete_genre(
 
 async def list_stars(
         db: AsyncSession
-) -> list[StarModel]:
+) -> Sequence[StarModel]:
 
     """
     Retrieve all movie stars from the database.
@@ -184,12 +198,7 @@ async def get_star(
     """
 
     star = await movie_crud.get_star_by_id(db, star_id)
-    if not star:
-        raise HTTPException(
-            status_code=404,
-            detail="Star not found."
-        )
-    return star
+    return _require(star, "Star")
 
 
 async def create_star(
@@ -223,12 +232,7 @@ async def update_star(
     """
 
     updated = await movie_crud.edit_star(db, star_id, star_data)
-    if not updated:
-        raise HTTPException(
-            status_code=404,
-            detail="Star not found."
-        )
-    return updated
+    return _require(updated, "Star")
 
 
 async def delete_star(
@@ -255,7 +259,7 @@ async def delete_star(
 
 async def list_directors(
         db: AsyncSession
-) -> list[DirectorModel]:
+) -> Sequence[DirectorModel]:
 
     """
     Retrieve all directors from the database.
@@ -283,12 +287,7 @@ async def get_director(
         db,
         director_id
     )
-    if not director:
-        raise HTTPException(
-            status_code=404,
-            detail="Director not found."
-        )
-    return director
+    return _require(director, "Director")
 
 
 async def create_director(
@@ -326,12 +325,7 @@ async def update_director(
         director_id,
         director_data
     )
-    if not updated:
-        raise HTTPException(
-            status_code=404,
-            detail="Director not found."
-        )
-    return updated
+    return _require(updated, "Director")
 
 
 async def delete_director(
@@ -358,7 +352,7 @@ async def delete_director(
 
 async def list_certifications(
         db: AsyncSession
-) -> list[CertificationModel]:
+) -> Sequence[CertificationModel]:
 
     """
     Retrieve all certifications from the database.
@@ -385,12 +379,7 @@ async def get_certification(
     certification = await movie_crud.get_certification_by_id(
         db, certification_id
     )
-    if not certification:
-        raise HTTPException(
-            status_code=404,
-            detail="Certification not found."
-        )
-    return certification
+    return _require(certification, "Certification")
 
 
 async def create_certification(
@@ -430,12 +419,7 @@ async def update_certification(
         db, certification_id,
         certification_data
     )
-    if not updated:
-        raise HTTPException(
-            status_code=404,
-            detail="Certification not found."
-        )
-    return updated
+    return _require(updated, "Certification")
 
 
 async def delete_certification(
@@ -591,26 +575,23 @@ async def search_movies_stmt(db: AsyncSession, search: str) -> Select:
 
 
 async def get_movie_detail(
-        movie_id: int, db: AsyncSession
-) -> MovieModel:
+        db: AsyncSession,
+        movie_id: int
+) -> MovieDetailSchema:
 
     """
     Get detailed movie info by ID with related data.
-    :param movie_id: ID of the movie.
+
+    The database builds the document with the schema's keys, so the ORM does not hydrate the
+    movie and its relationships; the JSON is validated once through MovieDetailSchema.
     :param db: Async database session.
+    :param movie_id: ID of the movie.
     :raises HTTPException: If movie is not found.
     :return: MovieDetailSchema instance.
     """
 
-    movie = await movie_crud.get_movie_by_id(movie_id, db)
-
-    if not movie:
-        raise HTTPException(
-            status_code=404,
-            detail="Movie not found."
-        )
-
-    return MovieDetailSchema.model_validate(movie)
+    movie_json = _require(await movie_crud.get_movie_detail_json(db, movie_id), "Movie")
+    return MovieDetailSchema.model_validate_json(movie_json)
 
 
 async def create_movie(
@@ -643,12 +624,7 @@ async def update_movie(
     """
 
     movie = await movie_crud.edit_movie(db, movie_id, data)
-    if not movie:
-        raise HTTPException(
-            status_code=404,
-            detail="Movie not found."
-        )
-    return movie
+    return _require(movie, "Movie")
 
 
 async def delete_movie(
@@ -713,39 +689,53 @@ async def like_or_dislike_movie(
         HTTPException: If the movie with the given ID does not exist.
     """
 
-    movie = await db.get(MovieModel, movie_id)
-    if not movie:
-        raise HTTPException(status_code=404, detail="Movie not found.")
+    _require(await db.get(MovieModel, movie_id), "Movie")
 
-    stmt = select(MovieLikeModel).where(
-        MovieLikeModel.movie_id == movie_id,
-        MovieLikeModel.user_id == user.id
+    # A first reaction is inserted directly; ON CONFLICT makes a concurrent first reaction by
+    # the same user wait for the other one and fall through to the update branch below
+    # instead of failing on the (movie_id, user_id) unique constraint
+    insert_stmt = dialect_insert(db, MovieLikeModel).values(
+        user_id=user.id,
+        movie_id=movie_id,
+        is_like=is_like
+    )
+    inserted_id = await db.scalar(
+        insert_stmt
+        .on_conflict_do_nothing(index_elements=[MovieLikeModel.movie_id, MovieLikeModel.user_id])
+        .returning(MovieLikeModel.id)
     )
-    result = await db.execute(stmt)
-    like_obj = result.scalar_one_or_none()
 
-    if like_obj:
+    likes_delta = dislikes_delta = 0
+    if inserted_id is not None:
+        likes_delta, dislikes_delta = (1, 0) if is_like else (0, 1)
+        message = "Thanks for the response!"
+    else:
+        # Lock the user's reaction row until commit, so concurrent toggles by the same user apply
+        # their counter deltas one after the other instead of both starting from the old reaction
+        stmt = select(MovieLikeModel).where(
+            MovieLikeModel.movie_id == movie_id,
+            MovieLikeModel.user_id == user.id
+        ).with_for_update()
+        like_obj = (await db.execute(stmt)).scalar_one()
+        if like_obj.is_like != is_like:
+            likes_delta = 1 if is_like else -1
+            dislikes_delta = -likes_delta
         like_obj.is_like = is_like
         message = "The response has been updated. Thanks for the response!"
-    else:
-        like_obj = MovieLikeModel(
-            user_id=user.id,
-            movie_id=movie_id,
-            is_like=is_like
+
+    counters_result = await db.execute(
+        update(MovieModel)
+        .where(MovieModel.id == movie_id)
+        .values(
+            likes_count=MovieModel.likes_count + likes_delta,
+            dislikes_count=MovieModel.dislikes_count + dislikes_delta,
         )
-        db.add(like_obj)
-        message = "Thanks for the response!"
+        .returning(MovieModel.likes_count, MovieModel.dislikes_count)
+    )
+    total_likes, total_dislikes = counters_result.one()
 
     await db.commit()
 
-    total_stmt = select(
-        func.count().filter(MovieLikeModel.is_like == True), # noqa E712
-        func.count().filter(MovieLikeModel.is_like == False) # noqa E712
-    ).where(MovieLikeModel.movie_id == movie_id)
-
-    total_result = await db.execute(total_stmt)
-    total_likes, total_dislikes = total_result.one()
-
     return MovieLikeResponseSchema(
         message=message,
         total_likes=total_likes,
@@ -774,9 +764,7 @@ async def add_comment(
         CommentModel: The created comment instance.
     """
 
-    movie = await db.get(MovieModel, movie_id)
-    if not movie:
-        raise HTTPException(status_code=404, detail="Movie not found")
+    _require(await db.get(MovieModel, movie_id), "Movie")
 
     comment = CommentModel(
         content=data.content,
@@ -785,21 +773,19 @@ async def add_comment(
         user_id=user_id
     )
     db.add(comment)
-    await db.commit()
-    await db.refresh(comment)
-
-    result = await db.execute(
-        select(func.avg(CommentModel.rating)).where(CommentModel.movie_id == movie_id)
-    )
-    average_rating = result.scalar()
 
     await db.execute(
         update(MovieModel)
         .where(MovieModel.id == movie_id)
-        .values(meta_score=average_rating)
+        .values(
+            rating_sum=MovieModel.rating_sum + data.rating,
+            rating_count=MovieModel.rating_count + 1,
+            meta_score=(MovieModel.rating_sum + data.rating) / (MovieModel.rating_count + 1),
+        )
     )
 
     await db.commit()
+    await db.refresh(comment)
 
     return comment
 
@@ -807,7 +793,7 @@ async def add_comment(
 async def get_movie_comments(
         db: AsyncSession,
         movie_id: int
-) -> list[CommentModel]:
+) -> Sequence[CommentModel]:
 
     """
     Retrieve comments for a given movie.
@@ -828,7 +814,7 @@ async def get_movie_comments(
         .filter_by(movie_id=movie_id)
         .order_by(CommentModel.created_at.desc())
     )
-    return list(result.scalars().all())
+    return result.scalars().all()
 
 
 async def add_to_favorites(
@@ -909,7 +895,7 @@ async def get_favorites(
     name: str | None = None,
     genre_id: int | None = None,
     sort_by: str = "name",
-) -> list[MovieModel]:
+) -> Sequence[MovieModel]:
 
     """
     Retrieve the user's list of favorite movies.
@@ -947,5 +933,4 @@ async def get_favorites(
         stmt = stmt.order_by(MovieModel.meta_score.desc())
 
     result = await db.execute(stmt)
-    movies = result.scalars().all()
-    return list(movies)
+    return result.scalars().all()
@@ -1,28 +1,54 @@
+from collections.abc import Sequence
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import BindParameter, Exists, Row, delete, func, insert, lambda_stmt, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import Load, joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
+from crud.shopping_cart import cart_relations
 from database.models.accounts import UserModel
 from database.models.movies import MovieModel
-from database.models.orders import OrderItemModel, OrderModel, OrderStatus
-from database.models.payments import (
-    PaymentItemModel,
-    PaymentModel,
-    PaymentStatus,
+from database.models.orders import (
+    ORDER_STATUS_PAID,
+    ORDER_STATUS_PENDING,
+    OrderItemModel,
+    OrderModel,
+    OrderStatus,
 )
 from database.models.shopping_cart import Cart, CartItem
 
+ORDERS_PAGE_LIMIT = 50
+ORDERS_PAGE_LIMIT_MAX = 100
+ORDERS_YIELD_PER = 200
+
+
+def order_relations(with_genres: bool = False) -> tuple[Load, ...]:
+    """
+    Loader options for orders as shown to users and admins: items with their movies (and the
+    movies' genres) and the user with their profile.
+    Any other relationship raises on access instead of lazy-loading per order.
+    """
+    items = selectinload(OrderModel.order_items).joinedload(OrderItemModel.movie)
+    if with_genres:
+        items = items.selectinload(MovieModel.genres)
+    return (
+        items,
+        joinedload(OrderModel.user).joinedload(UserModel.profile),
+        raiseload("*"),
+    )
+
 
 async def get_user_cart_with_items(user_id: int, db: AsyncSession) -> Cart:
     """Get user's cart with its items and movies."""
     cart_result = await db.execute(
         select(Cart)
         .where(Cart.user_id == user_id)
-        .options(joinedload(Cart.items).joinedload(CartItem.movie))
+        .options(*cart_relations(with_genres=False))
     )
     cart = cart_result.scalars().first()
 
@@ -34,76 +60,80 @@ async def get_user_cart_with_items(user_id: int, db: AsyncSession) -> Cart:
     return cart
 
 
-async def get_purchased_movie_ids(user_id: int, db: AsyncSession) -> set[int]:
-    """Get set of movie IDs that user has already purchased."""
-    purchased_query = await db.execute(
-        select(OrderItemModel.movie_id)
-        .join(OrderModel)
-        .where(
-            OrderModel.user_id == user_id,
-            OrderModel.status == OrderStatus.PAID,
-        )
-    )
-    return {row[0] for row in purchased_query.all()}
+async def get_purchased_and_pending_movie_ids(
+    user_id: int, db: AsyncSession
+) -> tuple[set[int], set[int]]:
+    """
+    Get the IDs of movies in the user's cart that the user has already purchased
+    or that are in one of the user's pending orders, using a single query.
+    Each cart row is tagged with correlated EXISTS checks, so the database only looks at
+    the orders containing movies from the cart, and the result has one row per cart item.
+    """
 
+    def in_user_orders(order_status: BindParameter[OrderStatus]) -> Exists:
+        return (
+            select(OrderItemModel.id)
+            .join(OrderModel)
+            .where(
+                OrderModel.user_id == user_id,
+                OrderModel.status == order_status,
+                OrderItemModel.movie_id == CartItem.movie_id,
+            )
+            .exists()
+        )
 
-async def get_pending_movie_ids(user_id: int, db: AsyncSession) -> set[int]:
-    """Get set of movie IDs that are in user's pending orders."""
-    pending_query = await db.execute(
-        select(OrderItemModel.movie_id)
-        .join(OrderModel)
-        .where(
-            OrderModel.user_id == user_id,
-            OrderModel.status == OrderStatus.PENDING,
+    result = await db.execute(
+        select(
+            CartItem.movie_id,
+            in_user_orders(ORDER_STATUS_PAID).label("already_paid"),
+            in_user_orders(ORDER_STATUS_PENDING).label("pending"),
         )
+        .join(Cart)
+        .where(Cart.user_id == user_id)
     )
-    return {row[0] for row in pending_query.all()}
+    purchased_movie_ids: set[int] = set()
+    pending_movie_ids: set[int] = set()
+    for movie_id, already_paid, pending in result.all():
+        if already_paid:
+            purchased_movie_ids.add(movie_id)
+        elif pending:
+            pending_movie_ids.add(movie_id)
+    return purchased_movie_ids, pending_movie_ids
 
 
 async def process_cart_items(
     cart: Cart,
     purchased_movie_ids: set[int],
     pending_movie_ids: set[int],
-    order_id: int,
-) -> tuple[list[OrderItemModel], list[dict], float]:
-    """Process cart items and create order items."""
-    order_items_to_add = []
+) -> tuple[set[int], list[dict]]:
+    """Find the cart movies that cannot be ordered, with the reason for each."""
+    excluded_movie_ids = set()
     excluded_movies_details = []
-    total_amount = 0.0
 
     for item in cart.items:
         if item.movie_id in purchased_movie_ids:
-            excluded_movies_details.append({
-                "movie_id": item.movie_id,
-                "title": item.movie.name,
-                "reason": "Already purchased",
-            })
-            continue
-
-        if item.movie_id in pending_movie_ids:
-            excluded_movies_details.append({
-                "movie_id": item.movie_id,
-                "title": item.movie.name,
-                "reason": "Already in a pending order",
-            })
+            reason = "Already purchased"
+        elif item.movie_id in pending_movie_ids:
+            reason = "Already in a pending order"
+        else:
             continue
 
-        order_item = OrderItemModel(
-            order_id=order_id,
-            movie_id=item.movie_id,
-            price_at_order=item.movie.price,
-        )
-        order_items_to_add.append(order_item)
-        total_amount += float(item.movie.price)
+        excluded_movie_ids.add(item.movie_id)
+        excluded_movies_details.append({
+            "movie_id": item.movie_id,
+            "title": item.movie.name,
+            "reason": reason,
+        })
 
-    return order_items_to_add, excluded_movies_details, total_amount
+    return excluded_movie_ids, excluded_movies_details
 
 
 async def clear_cart_items(cart: Cart, db: AsyncSession) -> None :
-    """Clear all items from the cart."""
-    for item in cart.items:
-        await db.delete(item)
-    await db.commit()
+    """
+    Clear all items from the cart with a single bulk DELETE.
+    The caller is responsible for committing the transaction.
+    """
+    await db.execute(delete(CartItem).where(CartItem.cart_id == cart.id))
 
 
 async def create_order_from_cart(user_id: int, db: AsyncSession) -> OrderModel:
@@ -115,25 +145,18 @@ async def create_order_from_cart(user_id: int, db: AsyncSession) -> OrderModel:
         HTTPException: If the cart is empty, or if no valid movies can be added to the order.
     """
 
-    # Get cart and validate
+    # Both reads run in the request's session and transaction, so the cart and the
+    # purchased/pending lookup see the same snapshot and use one pooled connection
     cart = await get_user_cart_with_items(user_id, db)
-
-    # Get purchased and pending movies
-    purchased_movie_ids = await get_purchased_movie_ids(user_id, db)
-    pending_movie_ids = await get_pending_movie_ids(user_id, db)
-
-    # Create new order
-    new_order = OrderModel(user_id=user_id)
-    db.add(new_order)
-    await db.flush()
+    purchased_movie_ids, pending_movie_ids = await get_purchased_and_pending_movie_ids(user_id, db)
+    cart_movies = {item.movie_id: item.movie for item in cart.items}
 
     # Process cart items
-    order_items_to_add, excluded_movies_details, total_amount = await process_cart_items(
-        cart, purchased_movie_ids, pending_movie_ids, new_order.id
+    excluded_movie_ids, excluded_movies_details = await process_cart_items(
+        cart, purchased_movie_ids, pending_movie_ids
     )
 
-    if not order_items_to_add:
-        await db.rollback()
+    if len(excluded_movie_ids) == len(cart.items):
         detail_msg = "No valid movies to add to order."
         if excluded_movies_details:
             detail_msg += f" Excluded: {excluded_movies_details}"
@@ -141,42 +164,72 @@ async def create_order_from_cart(user_id: int, db: AsyncSession) -> OrderModel:
             status_code=status.HTTP_400_BAD_REQUEST, detail=detail_msg
         )
 
-    # Add order items and update total
-    db.add_all(order_items_to_add)
-    new_order.total_amount = total_amount
-    await db.commit()
+    # Price the remaining items from the movies loaded with the cart, so the order is
+    # inserted with its total and needs no UPDATE once the items exist
+    prices = {
+        item.movie_id: item.movie.price
+        for item in cart.items
+        if item.movie_id not in excluded_movie_ids
+    }
 
-    # Clear cart
+    # Create new order; its id and created_at come back with the INSERT (eager_defaults)
+    new_order = OrderModel(user_id=user_id, total_amount=sum(prices.values(), Decimal("0")))
+    db.add(new_order)
+    await db.flush()
+
+    # Insert all order items in one batch with RETURNING, bypassing the unit of work
+    order_items = (
+        await db.scalars(
+            insert(OrderItemModel).returning(OrderItemModel),
+            [
+                {"order_id": new_order.id, "movie_id": movie_id, "price_at_order": price}
+                for movie_id, price in prices.items()
+            ],
+        )
+    ).all()
+
+    # Clear cart in the same transaction and commit once
     await clear_cart_items(cart, db)
+    await db.commit()
 
     if excluded_movies_details:
         print(f"Warning: Some movies were excluded from the order: {excluded_movies_details}")
 
-    # Return complete order with relationships
-    result = await db.execute(
-        select(OrderModel)
-        .where(OrderModel.id == new_order.id)
-        .options(
-            selectinload(OrderModel.order_items).selectinload(OrderItemModel.movie),
-            selectinload(OrderModel.user).selectinload(UserModel.profile),
-        )
-    )
-    return result.scalar_one()
+    # Assemble the response from objects already in memory instead of re-selecting the order:
+    # created_at came back with the order INSERT, the items from RETURNING,
+    # their movies from the loaded cart, and the user from the session's identity map
+    for order_item in order_items:
+        set_committed_value(order_item, "movie", cart_movies[order_item.movie_id])
+    set_committed_value(new_order, "order_items", list(order_items))
+    set_committed_value(new_order, "user", await db.get(UserModel, user_id))
+    return new_order
 
 
-async def get_user_orders(user_id: int, db: AsyncSession) -> list[OrderModel]:
+async def get_user_orders(
+    user_id: int,
+    db: AsyncSession,
+    limit: int = ORDERS_PAGE_LIMIT,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+) -> list[OrderModel]:
     """
-    Retrieves all orders for a specific user, with loaded related data.
+    Retrieves a page of orders for a specific user, newest first, with loaded related data.
+    Pages are keyset-based: pass the created_at and id of the last order of the previous page.
     """
-    result = await db.execute(
-        select(OrderModel)
+    page_size = min(limit, ORDERS_PAGE_LIMIT_MAX)
+    # Built through lambda_stmt so the statement construction is cached, like get_all_orders
+    stmt = lambda_stmt(
+        lambda: select(OrderModel)
         .where(OrderModel.user_id == user_id)
-        .options(
-            selectinload(OrderModel.order_items).selectinload(OrderItemModel.movie),
-            selectinload(OrderModel.user).selectinload(UserModel.profile),
-        )
-        .order_by(OrderModel.created_at.desc())
+        .options(*order_relations())
+        .order_by(OrderModel.created_at.desc(), OrderModel.id.desc())
+        .limit(page_size)
     )
+    if after_created_at is not None and after_id is not None:
+        stmt += lambda s: s.where(
+            tuple_(OrderModel.created_at, OrderModel.id) < tuple_(after_created_at, after_id)
+        )
+    result = await db.execute(stmt)
     return list(result.scalars().all())
 
 
@@ -188,13 +241,10 @@ async def get_order_detail(
     Raises HTTPException if order not found or user unauthorized.
     """
     result = await db.execute(
-        select(OrderModel)
-        .where(OrderModel.id == order_id, OrderModel.user_id == user_id)
-        .options(
-            selectinload(OrderModel.order_items)
-            .selectinload(OrderItemModel.movie)
-            .selectinload(MovieModel.genres),
-            selectinload(OrderModel.user).selectinload(UserModel.profile),
+        lambda_stmt(
+            lambda: select(OrderModel)
+            .where(OrderModel.id == order_id, OrderModel.user_id == user_id)
+            .options(*order_relations(with_genres=True))
         )
     )
     order = result.scalar_one_or_none()
@@ -206,115 +256,85 @@ async def get_order_detail(
     return order
 
 
-async def cancel_order(
-    db: AsyncSession, order_id: int, user_id: int
+async def get_order_for_mutation(
+    db: AsyncSession, order_id: int, user_id: Optional[int] = None
 ) -> OrderModel:
     """
-    Cancels an order (updates its status to CANCELED).
-    Raises HTTPException if order not found, already paid/canceled.
+    Loads only the OrderModel row by primary key for write paths, without related data.
+    The session's identity map serves repeated lookups within the same request.
+    Raises HTTPException if order not found or, when user_id is given, not owned by the user.
     """
-    order = await get_order_detail(db, order_id, user_id)
-
-    if order.status == OrderStatus.PAID:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Paid orders can only be canceled via refund request.",
-        )
-    elif order.status == OrderStatus.CANCELED:
+    order = await db.get(OrderModel, order_id)
+    if not order or (user_id is not None and order.user_id != user_id):
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Order is already canceled.",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found or access denied." if user_id is not None else "Order not found.",
         )
-
-    order.status = OrderStatus.CANCELED
-    await db.commit()
-    await db.refresh(order)
     return order
 
 
-async def process_order_payment(
+async def cancel_order(
     db: AsyncSession, order_id: int, user_id: int
 ) -> OrderModel:
     """
-    Processes payment for an order.
-    Revalidates total amount, simulates payment, and updates order status to PAID.
-
-    Raises:
-        HTTPException: If the order is already paid, canceled, or a movie is unavailable.
+    Cancels an order (updates its status to CANCELED).
+    Raises HTTPException if order not found, already paid/canceled.
     """
+    # Conditional UPDATE: only a pending order owned by the user is canceled, atomically,
+    # so there is no window between checking the status and writing it
     result = await db.execute(
-        select(OrderModel)
-        .where(OrderModel.id == order_id, OrderModel.user_id == user_id)
-        .options(
-            selectinload(OrderModel.order_items).selectinload(OrderItemModel.movie),
-            selectinload(OrderModel.user).selectinload(UserModel.profile),
+        update(OrderModel)
+        .where(
+            OrderModel.id == order_id,
+            OrderModel.user_id == user_id,
+            OrderModel.status == ORDER_STATUS_PENDING,
         )
+        .values(status=OrderStatus.CANCELED)
+        .returning(OrderModel.id)
     )
-    order = result.scalar_one_or_none()
-
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found or access denied.",
-        )
-
-    if order.status == OrderStatus.PAID:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Order already paid.",
-        )
-    if order.status == OrderStatus.CANCELED:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot pay for a canceled order.",
-        )
-
-    # Re-validate total amount before processing payment
-    recalculated_total = 0.0
-    for item in order.order_items:
-        # Load the current price of the movie
-        movie = await db.get(MovieModel, item.movie_id)
-        if not movie or not movie.price:
+    if result.scalar_one_or_none() is None:
+        # Nothing was updated; load the order only to report why
+        order = await get_order_for_mutation(db, order_id, user_id)
+        if order.status == OrderStatus.PAID:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Movie with ID {item.movie_id} in "
-                f"order is no longer available or has no price.",
+                detail="Paid orders can only be canceled via refund request.",
             )
-
-        # Use the current movie price for recalculation
-        recalculated_total += float(movie.price)
-
-    payment = PaymentModel(
-        user_id=user_id,
-        order_id=order.id,
-        status=PaymentStatus.SUCCESSFUL,
-        amount=recalculated_total,
-    )
-    db.add(payment)
-    await db.flush()
-
-    payment_items = []
-    for item in order.order_items:
-        payment_item = PaymentItemModel(
-            payment_id=payment.id,
-            order_item_id=item.id,
-            price_at_payment=item.price_at_order,
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Order is already canceled.",
         )
-        payment_items.append(payment_item)
-    db.add_all(payment_items)
 
-    order.status = OrderStatus.PAID
     await db.commit()
-
-    result = await db.execute(
-        select(OrderModel)
-        .where(OrderModel.id == order.id)
-        .options(
-            selectinload(OrderModel.order_items).selectinload(OrderItemModel.movie),
-            selectinload(OrderModel.user).selectinload(UserModel.profile),
+    return await get_order_detail(db, order_id, user_id)
+
+
+def _filter_orders_page(
+    stmt: StatementLambdaElement,
+    user_id: Optional[int],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    status: Optional[OrderStatus],
+    limit: int,
+    after_created_at: Optional[datetime],
+    after_id: Optional[int],
+) -> StatementLambdaElement:
+    """Add the admin order filters, keyset position, ordering and page size to an order statement."""
+    limit = min(limit, ORDERS_PAGE_LIMIT_MAX)
+    if user_id:
+        stmt += lambda s: s.where(OrderModel.user_id == user_id)
+    if status:
+        stmt += lambda s: s.where(OrderModel.status == status)
+    if start_date:
+        stmt += lambda s: s.where(OrderModel.created_at >= start_date)
+    if end_date:
+        stmt += lambda s: s.where(OrderModel.created_at <= end_date)
+    if after_created_at is not None and after_id is not None:
+        stmt += lambda s: s.where(
+            tuple_(OrderModel.created_at, OrderModel.id) < tuple_(after_created_at, after_id)
         )
-    )
-    return result.scalar_one()
+    stmt += lambda s: s.order_by(OrderModel.created_at.desc(), OrderModel.id.desc()).limit(limit)
+    return stmt
 
 
 async def get_all_orders(
@@ -323,27 +343,59 @@ async def get_all_orders(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     status: Optional[OrderStatus] = None,
+    limit: int = ORDERS_PAGE_LIMIT,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
 ) -> list[OrderModel]:
     """
-    Retrieves all orders, with optional filters (for admin).
+    Retrieves a page of orders, newest first, with optional filters (for admin).
+    Pages are keyset-based: pass the created_at and id of the last order of the previous page.
     """
-    query = select(OrderModel).options(
-        selectinload(OrderModel.order_items)
-        .selectinload(OrderItemModel.movie)
-        .selectinload(MovieModel.genres),
-        selectinload(OrderModel.user).selectinload(UserModel.profile),
+    # lambda_stmt caches the statement construction by the lambdas' code location,
+    # so each filter combination is built and compiled once; values become bound params
+    stmt = lambda_stmt(
+        lambda: select(OrderModel).options(*order_relations(with_genres=True))
+    )
+    stmt = _filter_orders_page(
+        stmt, user_id, start_date, end_date, status, limit, after_created_at, after_id
     )
-    if user_id:
-        query = query.where(OrderModel.user_id == user_id)
-    if status:
-        query = query.where(OrderModel.status == status)
-    if start_date:
-        query = query.where(OrderModel.created_at >= start_date)
-    if end_date:
-        query = query.where(OrderModel.created_at <= end_date)
 
-    result = await db.execute(query)
-    return list(result.scalars().all())
+    # Fetch orders in batches so order_items are selectin-loaded per batch of parents,
+    # keeping each IN (...) parameter list bounded by ORDERS_YIELD_PER
+    result = await db.stream(stmt, execution_options={"yield_per": ORDERS_YIELD_PER})
+    return [order async for order in result.scalars()]
+
+
+async def get_order_summaries(
+    db: AsyncSession,
+    user_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    status: Optional[OrderStatus] = None,
+    limit: int = ORDERS_PAGE_LIMIT,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+) -> Sequence[Row]:
+    """
+    Retrieves the same page as get_all_orders, but as flat summary rows (order columns plus
+    items_count) computed with one aggregate query, without loading items, movies or users.
+    """
+    stmt = lambda_stmt(
+        lambda: select(
+            OrderModel.id,
+            OrderModel.user_id,
+            OrderModel.created_at,
+            OrderModel.status,
+            OrderModel.total_amount,
+            func.count(OrderItemModel.id).label("items_count"),
+        )
+        .outerjoin(OrderItemModel, OrderItemModel.order_id == OrderModel.id)
+        .group_by(OrderModel.id)
+    )
+    stmt = _filter_orders_page(
+        stmt, user_id, start_date, end_date, status, limit, after_created_at, after_id
+    )
+    return (await db.execute(stmt)).all()
 
 
 async def update_order_status(
@@ -353,13 +405,17 @@ async def update_order_status(
     Updates the status of an order (for admin).
     Raises HTTPException if order not found.
     """
-    order = await db.get(OrderModel, order_id)
-    if not order:
+    result = await db.execute(
+        update(OrderModel)
+        .where(OrderModel.id == order_id)
+        .values(status=new_status)
+        .returning(OrderModel.user_id)
+    )
+    user_id = result.scalar_one_or_none()
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Order not found."
         )
 
-    order.status = new_status
     await db.commit()
-    await db.refresh(order)
-    return order
+    return await get_order_detail(db, order_id, user_id)
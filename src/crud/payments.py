@@ -1,13 +1,56 @@
+from datetime import datetime
 from typing import Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Insert, delete, func, insert, lambda_stmt, literal, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import InstrumentedAttribute, Load, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from database.models.orders import ORDER_STATUS_PENDING, OrderItemModel, OrderModel
+from database.models.payments import PaymentItemModel, PaymentModel, PaymentStatus
+from schemas.payments import PaymentCreateSchema, PaymentUpdateSchema
+
+
+def payment_relations() -> tuple[Load, ...]:
+    """
+    Loader options for the relationships shown with payment lists, one SELECT ... IN per relationship.
+    Any other relationship raises on access instead of lazy-loading per payment.
+    """
+    return (
+        selectinload(PaymentModel.payment_items),
+        selectinload(PaymentModel.order),
+        raiseload("*"),
+    )
+
 
-from database.models.orders import OrderItemModel, OrderModel, OrderStatus
-from database.models.payments import PaymentItemModel, PaymentModel
-from schemas.payments import PaymentCreateSchema, PaymentStatusSchema, PaymentUpdateSchema
+def payment_columns() -> tuple[InstrumentedAttribute, ...]:
+    """The payment columns shown in list views, for reads that skip ORM object construction."""
+    return (
+        PaymentModel.id,
+        PaymentModel.user_id,
+        PaymentModel.order_id,
+        PaymentModel.created_at,
+        PaymentModel.status,
+        PaymentModel.amount,
+        PaymentModel.session_id,
+        PaymentModel.payment_intent_id,
+    )
+
+
+def insert_payment_items_from_order(payment_id: int, order_id: int) -> Insert:
+    """
+    INSERT ... SELECT that creates one payment item per order item at its ordered price,
+    entirely in the database.
+    """
+    return insert(PaymentItemModel).from_select(
+        ["payment_id", "order_item_id", "price_at_payment"],
+        select(
+            literal(payment_id),
+            OrderItemModel.id,
+            OrderItemModel.price_at_order
+        ).where(OrderItemModel.order_id == order_id)
+    )
 
 
 async def create_payment(
@@ -16,34 +59,38 @@ async def create_payment(
     db: AsyncSession
 ) -> PaymentModel:
     try:
+        # Fetch the order (scoped to its owner) and its item total in one round trip
+        items_total = (
+            select(func.coalesce(func.sum(OrderItemModel.price_at_order), 0))
+            .where(OrderItemModel.order_id == OrderModel.id)
+            .correlate(OrderModel)
+            .scalar_subquery()
+        )
+        # The items and their movies are selectin-loaded only for an order that passed the
+        # ownership and status filters, in the same session and transaction
         result = await db.execute(
-            select(OrderModel)
+            select(OrderModel, items_total)
             .where(
                 OrderModel.id == payment.order_id,
                 OrderModel.user_id == user_id,
-                OrderModel.status == OrderStatus.PENDING
-            )
-            .options(
-                selectinload(OrderModel.order_items).selectinload(OrderItemModel.movie),
-                selectinload(OrderModel.user)
+                OrderModel.status == ORDER_STATUS_PENDING
             )
+            .options(selectinload(OrderModel.order_items).selectinload(OrderItemModel.movie))
         )
-        order = result.scalar_one_or_none()
-        if not order:
+        row = result.one_or_none()
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Order not found or not available for payment"
             )
+        order, total_amount = row
 
-        if float(order.total_amount) <= 0:
+        if order.total_amount <= 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Order amount must be positive"
             )
 
-        # Calculate total amount from order items
-        total_amount = sum(float(item.price_at_order) for item in order.order_items)
-
         # Create payment
         payment_data = payment.model_dump()
         payment_data["user_id"] = user_id
@@ -52,29 +99,20 @@ async def create_payment(
         db.add(db_payment)
         await db.flush()
 
-        payment_items = []
-        for item in order.order_items:
-            payment_item = PaymentItemModel(
-                payment_id=db_payment.id,
-                order_item_id=item.id,
-                price_at_payment=item.price_at_order
+        payment_items = (
+            await db.scalars(
+                insert_payment_items_from_order(db_payment.id, order.id)
+                .returning(PaymentItemModel)
             )
-            payment_items.append(payment_item)
-        db.add_all(payment_items)
+        ).all()
 
         await db.commit()
-        await db.refresh(db_payment)
 
-        # Load the order relationship
-        result = await db.execute(
-            select(PaymentModel)
-            .where(PaymentModel.id == db_payment.id)
-            .options(
-                selectinload(PaymentModel.order).selectinload(OrderModel.order_items).selectinload(OrderItemModel.movie),
-                selectinload(PaymentModel.payment_items)
-            )
-        )
-        return result.scalar_one()
+        # The order and its items were loaded up front and the payment items came back from
+        # RETURNING, so attach them instead of selecting the payment again
+        set_committed_value(db_payment, "order", order)
+        set_committed_value(db_payment, "payment_items", list(payment_items))
+        return db_payment
     except HTTPException:
         await db.rollback()
         raise
@@ -86,20 +124,50 @@ async def create_payment(
         )
 
 
+async def create_pending_payment(
+    db: AsyncSession,
+    order: OrderModel,
+    user_id: int,
+    session_id: str,
+) -> PaymentModel:
+    """
+    Create a PENDING payment for a checkout session together with one payment item per
+    order item, copied server-side with INSERT ... SELECT, and commit.
+    """
+    db_payment = PaymentModel(
+        user_id=user_id,
+        order_id=order.id,
+        status=PaymentStatus.PENDING,
+        amount=order.total_amount,
+        session_id=session_id,
+    )
+    db.add(db_payment)
+    await db.flush()
+
+    await db.execute(insert_payment_items_from_order(db_payment.id, order.id))
+    await db.commit()
+    return db_payment
+
+
 async def get_payment(
     payment_id: int,
     db: AsyncSession
 ) -> Optional[PaymentModel]:
-    result = await db.execute(select(PaymentModel).filter(PaymentModel.id == payment_id))
-    return result.scalar_one_or_none()
+    return await db.scalar(
+        lambda_stmt(lambda: select(PaymentModel).where(PaymentModel.id == payment_id))
+    )
 
 
 async def get_payments(
     db: AsyncSession,
     skip: int = 0,
     limit: int = 100,
+    load_relations: bool = True,
 ) -> list[PaymentModel]:
-    result = await db.execute(select(PaymentModel).offset(skip).limit(limit))
+    query = select(PaymentModel).offset(skip).limit(limit)
+    if load_relations:
+        query = query.options(*payment_relations())
+    result = await db.execute(query)
     return list(result.scalars().all())
 
 
@@ -108,13 +176,20 @@ async def update_payment(
     payment: PaymentUpdateSchema,
     db: AsyncSession
 ) -> Optional[PaymentModel]:
-    db_payment = await get_payment(payment_id, db)
+    update_data = payment.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_payment(payment_id, db)
+
+    # One UPDATE ... RETURNING instead of loading the row, setting attributes and flushing
+    result = await db.execute(
+        update(PaymentModel)
+        .where(PaymentModel.id == payment_id)
+        .values(**update_data)
+        .returning(PaymentModel)
+    )
+    db_payment = result.scalar_one_or_none()
     if db_payment:
-        update_data = payment.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_payment, field, value)
         await db.commit()
-        await db.refresh(db_payment)
     return db_payment
 
 
@@ -122,34 +197,47 @@ async def delete_payment(
     payment_id: int,
     db: AsyncSession
 ) -> Optional[PaymentModel]:
-    db_payment = await get_payment(payment_id, db)
+    # One DELETE ... RETURNING; payment items go with it via ON DELETE CASCADE, so the ORM
+    # doesn't have to load them first
+    result = await db.execute(
+        delete(PaymentModel)
+        .where(PaymentModel.id == payment_id)
+        .returning(PaymentModel)
+    )
+    db_payment = result.scalar_one_or_none()
     if db_payment:
-        await db.delete(db_payment)
         await db.commit()
     return db_payment
 
 
 async def get_user_payments(
     user_id: int,
-    db: AsyncSession
-) -> list[PaymentModel]:
-    result = await db.execute(select(PaymentModel).where(PaymentModel.user_id == user_id))
-    return list(result.scalars().all())
-
-
-async def get_all_payments(
     db: AsyncSession,
-    payment_status: Optional[PaymentStatusSchema] = None
+    limit: Optional[int] = None,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    load_relations: bool = True,
 ) -> list[PaymentModel]:
-    query = select(PaymentModel)
-    if payment_status:
-        query = query.where(PaymentModel.status == payment_status)
-    result = await db.execute(query)
-    return list(result.scalars().all())
-
-
-async def get_payment_by_id(payment_id: int, db: AsyncSession) -> PaymentModel | None:
-    result = await db.scalar(
-        select(PaymentModel).where(PaymentModel.id == payment_id)
+    """
+    Return a user's payments, newest first.
+
+    Pass the created_at and id of the last payment of the previous page as after_created_at / after_id
+    to seek to the next page on the (created_at, id) ordering instead of using OFFSET.
+    With load_relations, payment items and orders are selectin-loaded for the whole list.
+    """
+    # lambda_stmt caches the statement construction; values become bound params
+    stmt = lambda_stmt(
+        lambda: select(PaymentModel)
+        .where(PaymentModel.user_id == user_id)
+        .order_by(PaymentModel.created_at.desc(), PaymentModel.id.desc())
     )
-    return result
+    if after_created_at is not None and after_id is not None:
+        stmt += lambda s: s.where(
+            tuple_(PaymentModel.created_at, PaymentModel.id) < tuple_(after_created_at, after_id)
+        )
+    if limit is not None:
+        stmt += lambda s: s.limit(limit)
+    if load_relations:
+        stmt += lambda s: s.options(*payment_relations())
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
@@ -1,11 +1,15 @@
+from collections.abc import Iterable
 from typing import Optional
 
-from sqlalchemy import and_, select
+from sqlalchemy import ColumnElement, Exists, and_, bindparam, delete, insert, literal, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import Load, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from database.dialects import dialect_insert
 from database.models.movies import MovieModel
-from database.models.orders import OrderItemModel, OrderModel, OrderStatus
+from database.models.orders import ORDER_STATUS_PAID, OrderItemModel, OrderModel
 from database.models.shopping_cart import Cart, CartItem
 from exceptions.shopping_cart import (
     CartError,
@@ -17,20 +21,23 @@ from exceptions.shopping_cart import (
 )
 
 
+def cart_relations(with_genres: bool = True) -> tuple[Load, ...]:
+    """
+    Loader options for a cart with its items and their movies (and the movies' genres).
+    Any other relationship raises on access instead of lazy-loading.
+    """
+    items = selectinload(Cart.items).selectinload(CartItem.movie)
+    if with_genres:
+        items = items.selectinload(MovieModel.genres)
+    return items, raiseload("*")
+
+
 async def get_user_cart(db: AsyncSession, user_id: int) -> Optional[Cart]:
     """
     Get user's shopping cart with all items.
     If cart doesn't exist, returns None.
     """
-    query = (
-        select(Cart)
-        .options(
-            selectinload(Cart.items)
-            .selectinload(CartItem.movie)
-            .selectinload(MovieModel.genres)
-        )
-        .where(Cart.user_id == user_id)
-    )
+    query = select(Cart).options(*cart_relations()).where(Cart.user_id == user_id)
     result = await db.execute(query)
     return result.scalar_one_or_none()
 
@@ -45,33 +52,81 @@ async def create_cart(db: AsyncSession, user_id: int) -> Cart:
 
 
 async def get_or_create_cart(db: AsyncSession, user_id: int) -> Cart:
-    """Get existing cart or create new one if it doesn't exist."""
-    cart = await get_user_cart(db, user_id)
-    if not cart:
-        cart = await create_cart(db, user_id)
+    """
+    Get existing cart or create new one if it doesn't exist.
+
+    Tries INSERT ... ON CONFLICT (user_id) DO NOTHING RETURNING first: a brand-new cart comes
+    back from the INSERT with no items to load, and only an existing cart is selected with its
+    items.
+    """
+    cart = await db.scalar(
+        dialect_insert(db, Cart)
+        .values(user_id=user_id)
+        .on_conflict_do_nothing(index_elements=[Cart.user_id])
+        .returning(Cart)
+    )
+    if cart is None:
+        return await get_user_cart(db, user_id)
+
+    await db.commit()
+    set_committed_value(cart, "items", [])
     return cart
 
 
-async def is_movie_purchased(
-    db: AsyncSession, user_id: int, movie_id: int
-) -> bool:
-    """
-    Check if user has already purchased the movie.
-    Returns True if movie was purchased, False otherwise.
-    """
-    query = (
-        select(OrderItemModel)
+def movie_purchased_clause(user_id: int | ColumnElement[int], movie_id: int | ColumnElement[int]) -> Exists:
+    """EXISTS clause that is true when the user has a paid order containing the movie."""
+    return (
+        select(OrderItemModel.id)
         .join(OrderModel)
         .where(
             and_(
                 OrderModel.user_id == user_id,
                 OrderItemModel.movie_id == movie_id,
-                OrderModel.status == OrderStatus.PAID,
+                OrderModel.status == ORDER_STATUS_PAID,
             )
         )
+        .exists()
     )
-    result = await db.execute(query)
-    return result.scalar_one_or_none() is not None
+
+
+async def get_purchased_movie_ids(
+    db: AsyncSession, user_id: int, movie_ids: Iterable[int]
+) -> set[int]:
+    """
+    Return which of the given movies the user has already purchased, with a single query.
+    """
+    movie_ids = list(movie_ids)
+    if not movie_ids:
+        return set()
+    result = await db.scalars(
+        select(OrderItemModel.movie_id)
+        .join(OrderModel)
+        .where(
+            OrderModel.user_id == user_id,
+            OrderModel.status == ORDER_STATUS_PAID,
+            OrderItemModel.movie_id.in_(movie_ids),
+        )
+        .distinct()
+    )
+    return set(result.all())
+
+
+# Built once at import; callers only supply the bound values, so every call reuses the same
+# statement object and its cached compiled SQL
+_MOVIE_PURCHASED_STMT = select(
+    movie_purchased_clause(bindparam("user_id"), bindparam("movie_id"))
+)
+
+
+async def is_movie_purchased(
+    db: AsyncSession, user_id: int, movie_id: int
+) -> bool:
+    """
+    Check if user has already purchased the movie.
+    Returns True if movie was purchased, False otherwise.
+    """
+    # SELECT EXISTS stops at the first matching row and hydrates nothing
+    return bool(await db.scalar(_MOVIE_PURCHASED_STMT, {"user_id": user_id, "movie_id": movie_id}))
 
 
 async def add_movie_to_cart(
@@ -83,28 +138,51 @@ async def add_movie_to_cart(
     If successful, returns (cart_item, None).
     If error occurs, returns (None, error).
     """
-    movie = await db.get(MovieModel, movie_id)
-    if not movie:
-        return None, MovieNotFoundError()
-
-    query = select(CartItem).where(
-        CartItem.cart_id == cart_id, CartItem.movie_id == movie_id
+    in_cart = (
+        select(CartItem.id)
+        .where(CartItem.cart_id == cart_id, CartItem.movie_id == movie_id)
+        .exists()
     )
-    result = await db.execute(query)
-    if result.scalar_one_or_none():
+    # Insert only if the movie exists, is not in the cart yet and was not purchased,
+    # all checked by the same statement that inserts
+    try:
+        result = await db.execute(
+            insert(CartItem)
+            .from_select(
+                ["cart_id", "movie_id"],
+                select(literal(cart_id), MovieModel.id).where(
+                    MovieModel.id == movie_id,
+                    ~in_cart,
+                    ~movie_purchased_clause(user_id, MovieModel.id),
+                ),
+            )
+            .returning(CartItem.id)
+        )
+        cart_item_id = result.scalar_one_or_none()
+    except IntegrityError:
+        # A concurrent request added the same movie first (uix_cart_movie)
+        await db.rollback()
         return None, MovieAlreadyInCartError()
 
-    if await is_movie_purchased(db, user_id, movie_id):
+    if cart_item_id is None:
+        # Nothing was inserted; find out why with one query
+        movie_exists, already_in_cart = (
+            await db.execute(
+                select(select(MovieModel.id).where(MovieModel.id == movie_id).exists(), in_cart)
+            )
+        ).one()
+        if not movie_exists:
+            return None, MovieNotFoundError()
+        if already_in_cart:
+            return None, MovieAlreadyInCartError()
         return None, MovieAlreadyPurchasedError()
 
-    cart_item = CartItem(cart_id=cart_id, movie_id=movie_id)
-    db.add(cart_item)
     await db.commit()
 
     query = (
         select(CartItem)
         .options(selectinload(CartItem.movie).selectinload(MovieModel.genres))
-        .where(CartItem.id == cart_item.id)
+        .where(CartItem.id == cart_item_id)
     )
     result = await db.execute(query)
     cart_item = result.scalar_one()
@@ -121,6 +199,16 @@ async def remove_movie_from_cart(
     If successful, returns (True, None).
     If error occurs, returns (False, error).
     """
+    result = await db.execute(
+        delete(CartItem)
+        .where(CartItem.cart_id == cart_id, CartItem.movie_id == movie_id)
+        .returning(CartItem.id)
+    )
+    if result.scalar_one_or_none() is not None:
+        await db.commit()
+        return True, None
+
+    # Nothing was deleted; look up the cart and movie only to report why
     cart = await db.get(Cart, cart_id)
     if not cart:
         return False, CartNotFoundError()
@@ -129,18 +217,7 @@ async def remove_movie_from_cart(
     if not movie:
         return False, MovieNotFoundError()
 
-    query = select(CartItem).where(
-        CartItem.cart_id == cart_id, CartItem.movie_id == movie_id
-    )
-    result = await db.execute(query)
-    cart_item = result.scalar_one_or_none()
-
-    if not cart_item:
-        return False, MovieNotInCartError()
-
-    await db.delete(cart_item)
-    await db.commit()
-    return True, None
+    return False, MovieNotInCartError()
 
 
 async def clear_cart(
@@ -156,12 +233,6 @@ async def clear_cart(
     if not cart:
         return False, CartNotFoundError()
 
-    query = select(CartItem).where(CartItem.cart_id == cart_id)
-    result = await db.execute(query)
-    items = result.scalars().all()
-
-    for item in items:
-        await db.delete(item)
-
+    await db.execute(delete(CartItem).where(CartItem.cart_id == cart_id))
     await db.commit()
     return True, None
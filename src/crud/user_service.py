@@ -1,13 +1,13 @@
-from datetime import datetime, timezone
-from typing import Optional, cast
+from typing import Optional
 
 from pydantic import EmailStr
-from sqlalchemy import delete, select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import Row, delete, func, lambda_stmt, select
+from sqlalchemy.exc import NoResultFound, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import raiseload
 
 from config import get_settings
+from database.dialects import dialect_insert
 from database.models.accounts import (
     ActivationTokenModel,
     PasswordResetTokenModel,
@@ -27,19 +27,32 @@ from schemas.accounts import (
     UserRegistrationRequestSchema,
 )
 from security.interfaces import JWTAuthManagerInterface
+from security.passwords import dummy_verify_password, verify_password
+
+settings = get_settings()
+
+# Group ids never change while the app runs; resolved on first use and reused by every registration.
+# No lock: concurrent first lookups each run the same SELECT and store the same id.
+_user_group_ids: dict[UserGroupEnum, int] = {}
+
+
+def clear_user_group_ids() -> None:
+    """Forget the memoized group ids, e.g. after the user_groups table has been recreated."""
+    _user_group_ids.clear()
 
 
 class UserService:
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.settings = get_settings()
+        self.settings = settings
 
     async def create_user(self, user: UserRegistrationRequestSchema) -> UserModel:
         """Create a new user with activation token."""
         try:
-            result = await self.db.execute(select(UserGroupModel).where(UserGroupModel.name == UserGroupEnum.USER))
-            group = result.scalar_one()
-            db_user = UserModel.create(email=str(user.email), raw_password=user.password, group_id=group.id)
+            group_id = await self.get_group_id(UserGroupEnum.USER)
+            if group_id is None:
+                raise NoResultFound(f"User group {UserGroupEnum.USER.value} not found")
+            db_user = UserModel.create(email=str(user.email), raw_password=user.password, group_id=group_id)
 
             self.db.add(db_user)
             await self.db.flush()
@@ -47,91 +60,146 @@ class UserService:
             activation_token = ActivationTokenModel(user_id=db_user.id)
             self.db.add(activation_token)
             await self.db.commit()
-            await self.db.refresh(db_user)
 
             return db_user
         except Exception:
             await self.db.rollback()
             raise
 
+    async def get_group_id(self, name: UserGroupEnum) -> Optional[int]:
+        """Get the id of a user group, cached for the lifetime of the process."""
+        group_id = _user_group_ids.get(name)
+        if group_id is None:
+            group_id = await self.db.scalar(select(UserGroupModel.id).where(UserGroupModel.name == name))
+            if group_id is not None:
+                _user_group_ids[name] = group_id
+        return group_id
+
     async def get_user_by_email(self, email: EmailStr) -> Optional[UserModel]:
         """Get user by email."""
-        result = await self.db.execute(select(UserModel).where(UserModel.email == email))
+        # lambda_stmt caches the statement construction; values become bound params.
+        # raiseload("*"): callers get the columns only, touching a relationship raises instead of lazy-loading
+        result = await self.db.execute(
+            lambda_stmt(lambda: select(UserModel).where(UserModel.email == email).options(raiseload("*")))
+        )
         return result.scalar_one_or_none()
 
+    async def _get_user_auth_fields(self, email: EmailStr) -> Optional[Row[tuple[int, bool, str]]]:
+        """Get the (id, is_active, hashed_password) columns of a user by email, without loading the ORM object."""
+        result = await self.db.execute(
+            lambda_stmt(
+                lambda: select(
+                    UserModel.id, UserModel.is_active, UserModel._hashed_password.label("hashed_password")
+                ).where(UserModel.email == email)
+            )
+        )
+        return result.one_or_none()
+
     async def activate_user(self, activation_data: UserActivationRequestSchema) -> str:
         """Activate user account using activation token.
         Returns: 'success', 'already_active', or 'invalid_token'"""
-        token_record = await self.db.scalar(
-            select(ActivationTokenModel)
-            .options(joinedload(ActivationTokenModel.user))
-            .join(UserModel)
-            .where(UserModel.email == activation_data.email, ActivationTokenModel.token == activation_data.token)
-        )
-
-        now_utc = datetime.now(timezone.utc)
-        if not token_record or cast(datetime, token_record.expires_at).replace(tzinfo=timezone.utc) < now_utc:
-            user = await self.get_user_by_email(activation_data.email)
-            if user and user.is_active:
-                return "already_active"
-            if token_record:
-                await self.db.delete(token_record)
-                await self.db.commit()
-            return "invalid_token"
+        email, token = activation_data.email, activation_data.token
+        # The token, its user and whether it has expired (by the database clock) come back in one row
+        row = (
+            await self.db.execute(
+                lambda_stmt(
+                    lambda: select(
+                        ActivationTokenModel,
+                        UserModel,
+                        (ActivationTokenModel.expires_at <= func.now()).label("expired"),
+                    )
+                    .join(UserModel, ActivationTokenModel.user_id == UserModel.id)
+                    .where(UserModel.email == email, ActivationTokenModel.token == token)
+                    # Both entities come from this row; block any further lazy loads from them
+                    .options(raiseload("*"))
+                )
+            )
+        ).first()
+        if row is None:
+            is_active = await self.db.scalar(
+                lambda_stmt(lambda: select(UserModel.is_active).where(UserModel.email == email))
+            )
+            return "already_active" if is_active else "invalid_token"
 
-        user = token_record.user
+        token_record, user, expired = row
         if user.is_active:
             return "already_active"
 
+        if expired:
+            await self.db.delete(token_record)
+            await self.db.commit()
+            return "invalid_token"
+
         user.is_active = True
         await self.db.delete(token_record)
         await self.db.commit()
         return "success"
 
+    async def _replace_token(
+        self, token_model: type[ActivationTokenModel] | type[PasswordResetTokenModel], user_id: int
+    ) -> None:
+        """
+        Issue a fresh token for the user, replacing any existing one, and commit.
+        One INSERT ... ON CONFLICT (user_id) DO UPDATE instead of a DELETE followed by an INSERT.
+        """
+        stmt = dialect_insert(self.db, token_model).values(user_id=user_id)
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[token_model.user_id],
+                set_={"token": stmt.excluded.token, "expires_at": stmt.excluded.expires_at},
+            )
+        )
+        await self.db.commit()
+
     async def resend_activation(self, data: ResendActivationRequestSchema) -> bool:
         """Resend activation email."""
-        user = await self.get_user_by_email(data.email)
+        user = await self._get_user_auth_fields(data.email)
         if not user or user.is_active:
             return False
 
-        await self.db.execute(delete(ActivationTokenModel).where(ActivationTokenModel.user_id == user.id))
-        activation_token = ActivationTokenModel(user_id=user.id)
-        self.db.add(activation_token)
-        await self.db.commit()
+        await self._replace_token(ActivationTokenModel, user.id)
         return True
 
     async def request_password_reset(self, data: PasswordResetRequestSchema) -> bool:
         """Request password reset token."""
-        user = await self.get_user_by_email(data.email)
+        user = await self._get_user_auth_fields(data.email)
         if not user or not user.is_active:
             return False
 
-        await self.db.execute(delete(PasswordResetTokenModel).where(PasswordResetTokenModel.user_id == user.id))
-        reset_token = PasswordResetTokenModel(user_id=user.id)
-        self.db.add(reset_token)
-        await self.db.commit()
+        await self._replace_token(PasswordResetTokenModel, user.id)
         return True
 
     async def reset_password(self, data: PasswordResetCompleteRequestSchema) -> str:
         """Reset user password using reset token. Returns: 'success', 'invalid', 'inactive', 'commit_error'"""
-        token_record = await self.db.scalar(
-            select(PasswordResetTokenModel)
-            .options(joinedload(PasswordResetTokenModel.user))
-            .join(UserModel)
-            .where(UserModel.email == data.email, PasswordResetTokenModel.token == data.token)
-        )
+        email, token = data.email, data.token
+        # The token, its user and whether it has expired (by the database clock) come back in one row
+        row = (
+            await self.db.execute(
+                lambda_stmt(
+                    lambda: select(
+                        PasswordResetTokenModel,
+                        UserModel,
+                        (PasswordResetTokenModel.expires_at <= func.now()).label("expired"),
+                    )
+                    .join(UserModel, PasswordResetTokenModel.user_id == UserModel.id)
+                    .where(UserModel.email == email, PasswordResetTokenModel.token == token)
+                    # Both entities come from this row; block any further lazy loads from them
+                    .options(raiseload("*"))
+                )
+            )
+        ).first()
 
-        now_utc = datetime.now(timezone.utc)
-        if not token_record or cast(datetime, token_record.expires_at).replace(tzinfo=timezone.utc) < now_utc:
-            user = await self.get_user_by_email(data.email)
-            if user:
-                await self.db.execute(
-                    delete(PasswordResetTokenModel).where(PasswordResetTokenModel.user_id == user.id)
+        if row is None or row.expired:
+            # Invalidate the user's reset token; the user is resolved by email inside the DELETE
+            await self.db.execute(
+                delete(PasswordResetTokenModel).where(
+                    PasswordResetTokenModel.user_id.in_(select(UserModel.id).where(UserModel.email == email))
                 )
-                await self.db.commit()
+            )
+            await self.db.commit()
             return "invalid"
 
-        user = token_record.user
+        token_record, user, _ = row
         if not user.is_active:
             return "inactive"
 
@@ -148,8 +216,12 @@ class UserService:
         self, login_data: UserLoginRequestSchema, jwt_manager: JWTAuthManagerInterface
     ) -> tuple[Optional[str], Optional[str], Optional[str]]:
         """Authenticate user and return access and refresh tokens, plus error code."""
-        user = await self.get_user_by_email(login_data.email)
-        if not user or not user.verify_password(login_data.password):
+        user = await self._get_user_auth_fields(login_data.email)
+        if not user:
+            # Pay the hashing cost anyway so unknown emails can't be told apart by response time
+            dummy_verify_password()
+            return None, None, None
+        if not verify_password(login_data.password, user.hashed_password):
             return None, None, None
 
         if not user.is_active:
@@ -161,7 +233,6 @@ class UserService:
                 user_id=user.id, days_valid=self.settings.LOGIN_TIME_DAYS, token=jwt_refresh_token
             )
             self.db.add(refresh_token)
-            await self.db.flush()
             await self.db.commit()
         except SQLAlchemyError:
             await self.db.rollback()
@@ -180,14 +251,22 @@ class UserService:
         except BaseSecurityError:
             return None, "expired"
 
-        refresh_token_record = await self.db.scalar(
-            select(RefreshTokenModel).filter_by(token=token_data.refresh_token)
-        )
-        if not refresh_token_record:
+        refresh_token = token_data.refresh_token
+        # The stored token and its user's existence are checked in one statement
+        row = (
+            await self.db.execute(
+                lambda_stmt(
+                    lambda: select(RefreshTokenModel.user_id, UserModel.id.label("existing_user_id"))
+                    .outerjoin(UserModel, RefreshTokenModel.user_id == UserModel.id)
+                    .where(RefreshTokenModel.token == refresh_token)
+                )
+            )
+        ).first()
+        if row is None:
             return None, "not_found"
 
-        user = await self.db.scalar(select(UserModel).filter_by(id=user_id))
-        if not user:
+        # The JWT must belong to the user the token was issued to
+        if row.existing_user_id is None or row.user_id != user_id:
             return None, "user_not_found"
 
         return jwt_manager.create_access_token({"user_id": user_id}), None
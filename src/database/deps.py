@@ -4,10 +4,13 @@ from collections.abc import AsyncGenerator, Generator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# Read once at import instead of on every request. The session modules are still imported inside
+# the providers: they import config, which imports this module, so a top-level import would be circular.
+_TESTING = os.getenv("ENVIRONMENT", "developing") == "testing"
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    environment = os.getenv("ENVIRONMENT", "developing")
-    if environment == "testing":
+    if _TESTING:
         from database.session_sqlite import get_sqlite_db
 
         async for session in get_sqlite_db():
@@ -20,8 +23,7 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 def get_db_contextmanager() -> "contextlib.AbstractAsyncContextManager":
-    environment = os.getenv("ENVIRONMENT", "developing")
-    if environment == "testing":
+    if _TESTING:
         from database.session_sqlite import get_sqlite_db_contextmanager
 
         return get_sqlite_db_contextmanager()
@@ -32,8 +34,7 @@ def get_db_contextmanager() -> "contextlib.AbstractAsyncContextManager":
 
 
 def get_sync_db() -> Generator["contextlib.AbstractContextManager", None, None]:
-    environment = os.getenv("ENVIRONMENT", "developing")
-    if environment == "testing":
+    if _TESTING:
         from database.session_sqlite import get_sync_sqlite_db
 
         return get_sync_sqlite_db()
@@ -44,8 +45,7 @@ def get_sync_db() -> Generator["contextlib.AbstractContextManager", None, None]:
 
 
 def get_sync_db_contextmanager() -> "contextlib.AbstractContextManager":
-    environment = os.getenv("ENVIRONMENT", "developing")
-    if environment == "testing":
+    if _TESTING:
         from database.session_sqlite import get_sync_sqlite_db_contextmanager
 
         return get_sync_sqlite_db_contextmanager()
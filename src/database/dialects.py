@@ -0,0 +1,56 @@
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.functions import FunctionElement
+
+from database.models.base import Base
+
+
+def is_postgresql(db: AsyncSession) -> bool:
+    """True when the session is bound to PostgreSQL (production); tests run on SQLite."""
+    return db.bind.dialect.name == "postgresql"
+
+
+def dialect_insert(db: AsyncSession, model: type[Base]) -> postgresql.Insert | sqlite.Insert:
+    """
+    INSERT for the session's backend. Both dialect inserts support
+    on_conflict_do_nothing / on_conflict_do_update with index_elements and `excluded`.
+    """
+    if is_postgresql(db):
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+class JsonObject(FunctionElement):
+    """JSON object from alternating key and value arguments: json_build_object on PostgreSQL."""
+
+    inherit_cache = True
+
+
+class JsonArrayAgg(FunctionElement):
+    """Aggregate of its argument into a JSON array, `[]` (not NULL) when there are no rows."""
+
+    inherit_cache = True
+
+
+@compiles(JsonObject)
+def _compile_json_object(element: JsonObject, compiler: SQLCompiler, **kw: Any) -> str:
+    return f"json_object({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(JsonObject, "postgresql")
+def _compile_json_object_postgresql(element: JsonObject, compiler: SQLCompiler, **kw: Any) -> str:
+    return f"json_build_object({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(JsonArrayAgg)
+def _compile_json_array_agg(element: JsonArrayAgg, compiler: SQLCompiler, **kw: Any) -> str:
+    return f"json_group_array({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(JsonArrayAgg, "postgresql")
+def _compile_json_array_agg_postgresql(element: JsonArrayAgg, compiler: SQLCompiler, **kw: Any) -> str:
+    return f"coalesce(json_agg({compiler.process(element.clauses, **kw)}), '[]'::json)"
@@ -2,7 +2,7 @@ import enum
 from datetime import date, datetime, timedelta, timezone
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Boolean, Date, DateTime, Enum, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy import Boolean, Date, DateTime, Enum, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from database.models.base import Base
@@ -42,6 +42,8 @@ class UserGroupModel(Base):
 
 class UserModel(Base):
     __tablename__ = "users"
+    # Fetch server-generated columns (created_at, updated_at) with RETURNING on INSERT instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
@@ -165,7 +167,12 @@ class ActivationTokenModel(TokenBaseModel):
 
     user: Mapped["UserModel"] = relationship("UserModel", back_populates="activation_token")
 
-    __table_args__ = (UniqueConstraint("user_id"),)
+    __table_args__ = (
+        UniqueConstraint("user_id"),
+        # Token checks match on token and join to users on user_id; the included columns cover
+        # the rest of the token row, so Postgres can answer from the index alone
+        Index("ix_activation_tokens_token_user", "token", "user_id", postgresql_include=["id", "expires_at"]),
+    )
 
     def __repr__(self):
         return f"<ActivationTokenModel(id={self.id}, token={self.token}, expires_at={self.expires_at})>"
@@ -176,7 +183,12 @@ class PasswordResetTokenModel(TokenBaseModel):
 
     user: Mapped["UserModel"] = relationship("UserModel", back_populates="password_reset_token")
 
-    __table_args__ = (UniqueConstraint("user_id"),)
+    __table_args__ = (
+        UniqueConstraint("user_id"),
+        # Token checks match on token and join to users on user_id; the included columns cover
+        # the rest of the token row, so Postgres can answer from the index alone
+        Index("ix_password_reset_tokens_token_user", "token", "user_id", postgresql_include=["id", "expires_at"]),
+    )
 
     def __repr__(self):
         return f"<PasswordResetTokenModel(id={self.id}, token={self.token}, expires_at={self.expires_at})>"
@@ -170,7 +170,11 @@ class MovieModel(Base):
         meta_score (float): Metacritic score.
         gross (float | None): Box office gross.
         descriptions (str): Movie descriptions.
-        price (float): Rental or purchase price.
+        price (Decimal): Rental or purchase price.
+        likes_count (int): Number of likes, maintained on every like/dislike.
+        dislikes_count (int): Number of dislikes, maintained on every like/dislike.
+        rating_sum (float): Sum of comment ratings, used to derive meta_score.
+        rating_count (int): Number of rated comments, used to derive meta_score.
 
         certification_id (int): Foreign key to the CertificationModel.
         certification (CertificationModel): Linked certification.
@@ -199,6 +203,10 @@ class MovieModel(Base):
     gross: Mapped[float | None] = mapped_column(nullable=True)
     descriptions: Mapped[str] = mapped_column(Text, nullable=False)
     price: Mapped[Decimal] = mapped_column(Numeric(10, 2))
+    likes_count: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+    dislikes_count: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+    rating_sum: Mapped[float] = mapped_column(default=0, server_default="0", nullable=False)
+    rating_count: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
 
     certification_id: Mapped[int] = mapped_column(
         ForeignKey("certifications.id"),
@@ -251,9 +259,11 @@ class MovieLikeModel(Base):
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    # (movie_id, user_id) is covered by the unique constraint; a user's likes need their own index
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id",
-        ondelete="CASCADE")
+        ondelete="CASCADE"),
+        index=True
     )
     movie_id: Mapped[int] = mapped_column(
         ForeignKey("movies.id",
@@ -293,7 +303,8 @@ class CommentModel(Base):
     )
     movie_id: Mapped[int] = mapped_column(
         ForeignKey("movies.id"),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     user: Mapped["UserModel"] = relationship(
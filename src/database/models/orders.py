@@ -3,7 +3,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, Numeric
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, Numeric, bindparam
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql.functions import func
 
@@ -23,6 +23,16 @@ class OrderStatus(enum.Enum):
 
 class OrderModel(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Purchased/pending movie lookups filter on (user_id, status) and join on id;
+        # INCLUDE lets PostgreSQL answer them with an index-only scan
+        Index("ix_orders_user_status", "user_id", "status", postgresql_include=["id"]),
+        # User order listings page by (created_at, id) DESC; B-tree indexes scan backwards for DESC
+        Index("ix_orders_user_created", "user_id", "created_at", "id"),
+    )
+    # Fetch server-generated columns (created_at) with RETURNING on INSERT instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -34,11 +44,26 @@ class OrderModel(Base):
     payments: Mapped[list["PaymentModel"]] = relationship("PaymentModel", back_populates="order")
 
 
+# Status constants for filters, bound once at import and reused by every query.
+# literal_execute renders the value inline at execution time, so the SQL text stays constant
+# per status (prepared-statement cache friendly) and the planner sees the actual status.
+ORDER_STATUS_PAID = bindparam(
+    "order_status_paid", OrderStatus.PAID, type_=OrderModel.__table__.c.status.type, literal_execute=True
+)
+ORDER_STATUS_PENDING = bindparam(
+    "order_status_pending", OrderStatus.PENDING, type_=OrderModel.__table__.c.status.type, literal_execute=True
+)
+
+
 class OrderItemModel(Base):
     __tablename__ = "order_items"
+    # Covers joins from orders and the per-movie purchase checks; also serves order_id lookups
+    __table_args__ = (Index("ix_order_items_order_movie", "order_id", "movie_id"),)
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     order_id: Mapped[int] = mapped_column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
-    movie_id: Mapped[int] = mapped_column(Integer, ForeignKey("movies.id"), nullable=False)
+    # Per-movie lookups without an order (purchase checks, movie deletion) can't use the composite index
+    movie_id: Mapped[int] = mapped_column(Integer, ForeignKey("movies.id"), nullable=False, index=True)
     price_at_order: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
 
     order: Mapped["OrderModel"] = relationship("OrderModel", back_populates="order_items")
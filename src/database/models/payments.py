@@ -3,7 +3,7 @@ from decimal import Decimal
 from enum import Enum as PyEnum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Numeric, String, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Numeric, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.models.base import Base
@@ -23,6 +23,9 @@ class PaymentStatus(PyEnum):
 
 class PaymentModel(Base):
     __tablename__ = "payments"
+    __table_args__ = (Index("ix_payments_user_status_created", "user_id", "status", "created_at"),)
+    # Fetch server-generated columns (created_at) with RETURNING on INSERT instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,57 @@
+import asyncio
+
+from sqlalchemy import ColumnElement, ScalarSelect, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.deps import get_db_contextmanager
+from database.models.movies import CommentModel, MovieLikeModel, MovieModel
+
+
+async def recount_movie_reactions(db_session: AsyncSession) -> None:
+    """
+    Set every movie's likes_count and dislikes_count from its movie_likes rows.
+    The counters are maintained incrementally, so this brings reactions stored before the
+    counters existed (or any drift) back in line. Safe to run repeatedly.
+    """
+
+    def reactions_count(is_like: bool) -> ScalarSelect:
+        return (
+            select(func.count())
+            .where(MovieLikeModel.movie_id == MovieModel.id, MovieLikeModel.is_like.is_(is_like))
+            .scalar_subquery()
+        )
+
+    await db_session.execute(
+        update(MovieModel).values(likes_count=reactions_count(True), dislikes_count=reactions_count(False))
+    )
+    print("Movie reaction counters recounted.")
+
+
+async def recount_movie_ratings(db_session: AsyncSession) -> None:
+    """
+    Set every movie's rating_sum and rating_count from its comments, so the next comment
+    extends the running average over all earlier ratings instead of starting it over.
+    meta_score itself is left as is. Safe to run repeatedly.
+    """
+
+    def comments_aggregate(aggregate: ColumnElement) -> ScalarSelect:
+        return select(aggregate).where(CommentModel.movie_id == MovieModel.id).scalar_subquery()
+
+    await db_session.execute(
+        update(MovieModel).values(
+            rating_sum=comments_aggregate(func.coalesce(func.sum(CommentModel.rating), 0)),
+            rating_count=comments_aggregate(func.count()),
+        )
+    )
+    print("Movie rating totals recounted.")
+
+
+async def main() -> None:
+    async with get_db_contextmanager() as db_session:
+        await recount_movie_reactions(db_session)
+        await recount_movie_ratings(db_session)
+        await db_session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -18,6 +18,15 @@ postgresql_engine = create_async_engine(
     POSTGRESQL_DATABASE_URL,
     echo=False,
     future=True,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=True,
+    connect_args={
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    },
 )
 
 sync_database_url = POSTGRESQL_DATABASE_URL.replace("postgresql+asyncpg", "postgresql")
@@ -25,6 +34,9 @@ sync_postgresql_engine = create_engine(
     sync_database_url,
     echo=False,
     future=True,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=True,
 )
 
 AsyncPostgresqlSessionLocal = async_sessionmaker(
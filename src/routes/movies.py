@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi_pagination import Params
 from fastapi_pagination.ext.sqlalchemy import paginate as apaginate
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.dependencies import get_current_user, require_moderator
@@ -42,6 +43,7 @@ from crud.movie_service import (
 from database.deps import get_db
 from database.models import UserModel
 from pagination.pages import Page
+from routes.utils import json_list_response
 from schemas.movies import (
     CertificationCreateSchema,
     CertificationReadSchema,
@@ -71,6 +73,13 @@ from schemas.movies import (
 
 router = APIRouter(dependencies=[Depends(get_current_user)])
 
+genre_list_adapter = TypeAdapter(list[GenreReadSchema])
+star_list_adapter = TypeAdapter(list[StarReadSchema])
+director_list_adapter = TypeAdapter(list[DirectorReadSchema])
+certification_list_adapter = TypeAdapter(list[CertificationReadSchema])
+movie_list_adapter = TypeAdapter(list[MovieListItemSchema])
+comment_list_adapter = TypeAdapter(list[CommentReadSchema])
+
 
 @router.get(
     "/genres/",
@@ -78,13 +87,13 @@ router = APIRouter(dependencies=[Depends(get_current_user)])
 )
 async def get_genres(
         db: AsyncSession = Depends(get_db)
-) -> list[GenreReadSchema]:
+) -> Response:
 
     """
     Get a list of all movie genres with the number of movies of that genre.
     """
 
-    return await list_genres(db)
+    return json_list_response(genre_list_adapter, await list_genres(db))
 
 
 @router.get(
@@ -110,14 +119,13 @@ async def get_genre_by_id(
 async def get_movies_by_genre(
         genre_id: int,
         db: AsyncSession = Depends(get_db)
-) -> list[MovieListItemSchema]:
+) -> Response:
 
     """
     Enter a genre by its ID and get a list of movies with that genre.
     """
 
-    movies = await get_all_movies_by_genre(db, genre_id)
-    return [MovieListItemSchema.model_validate(movie) for movie in movies]
+    return json_list_response(movie_list_adapter, await get_all_movies_by_genre(db, genre_id))
 
 
 @router.post(
@@ -176,13 +184,13 @@ async def delete_movie_genre(
 @router.get("/stars/", response_model=list[StarReadSchema])
 async def get_stars(
         db: AsyncSession = Depends(get_db)
-) -> list[StarReadSchema]:
+) -> Response:
 
     """
     Get a list of all movie stars.
     """
 
-    return await list_stars(db)
+    return json_list_response(star_list_adapter, await list_stars(db))
 
 
 @router.get("/stars/{star_id}/", response_model=StarReadSchema)
@@ -253,13 +261,13 @@ async def delete_movie_star(
             )
 async def get_directors(
         db: AsyncSession = Depends(get_db)
-) -> list[DirectorReadSchema]:
+) -> Response:
 
     """
     Get a list of all movie directors.
     """
 
-    return await list_directors(db)
+    return json_list_response(director_list_adapter, await list_directors(db))
 
 
 @router.get("/directors/{director_id}/",
@@ -329,13 +337,13 @@ async def delete_movie_director(
             )
 async def get_certifications(
         db: AsyncSession = Depends(get_db)
-) -> list[CertificationReadSchema]:
+) -> Response:
 
     """
     Get a list of all movie certifications.
     """
 
-    return await list_certifications(db)
+    return json_list_response(certification_list_adapter, await list_certifications(db))
 
 
 @router.get("/certifications/{certification_id}/",
@@ -597,7 +605,7 @@ async def create_comment(
 async def list_comments(
     movie_id: int,
     db: AsyncSession = Depends(get_db)
-) -> list[CommentReadSchema]:
+) -> Response:
 
     """
     Retrieve all comments for a specific movie.
@@ -612,7 +620,7 @@ async def list_comments(
         list[CommentReadSchema]: A list of comments associated with the movie.
     """
 
-    return await get_movie_comments(db, movie_id)
+    return json_list_response(comment_list_adapter, await get_movie_comments(db, movie_id))
 
 
 @router.post("/favorites/", response_model=FavoriteReadSchema)
@@ -3,13 +3,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.dependencies import get_current_user, require_admin
 from crud import orders as order_crud
+from crud import payments as payment_crud
 from database.deps import get_db
 from database.models import OrderModel, OrderStatus
 from database.models.accounts import UserModel
-from database.models.payments import PaymentItemModel, PaymentModel, PaymentStatus
 from schemas.orders import (
     OrderFilterParams,
+    OrderPageParams,
     OrderResponse,
+    OrderSummaryResponse,
     OrderUpdateStatus,
 )
 from schemas.payments import CheckoutSessionResponse
@@ -36,13 +38,21 @@ async def create_order(
 
 @router.get("/", response_model=list[OrderResponse])
 async def list_user_orders(
+    page: OrderPageParams = Depends(),
     db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_user),
 ) -> list[OrderModel]:
     """
-    Retrieves a list of all orders for the current user.
+    Retrieves a page of orders for the current user, newest first.
+    Pass the created_at and id of the last order as after_created_at/after_id to get the next page.
     """
-    return await order_crud.get_user_orders(current_user.id, db)
+    return await order_crud.get_user_orders(
+        current_user.id,
+        db,
+        limit=page.limit,
+        after_created_at=page.after_created_at,
+        after_id=page.after_id,
+    )
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
@@ -103,26 +113,9 @@ async def process_order_payment_endpoint(
 
     session_data = await StripeService.create_checkout_session(request, order)
 
-    payment = PaymentModel(
-        user_id=current_user.id,
-        order_id=order.id,
-        status=PaymentStatus.PENDING,
-        amount=order.total_amount,
-        session_id=session_data.session_id
+    payment = await payment_crud.create_pending_payment(
+        db, order, current_user.id, session_data.session_id
     )
-    db.add(payment)
-    await db.flush()
-
-    payment_items = []
-    for item in order.order_items:
-        payment_item = PaymentItemModel(
-            payment_id=payment.id,
-            order_item_id=item.id,
-            price_at_payment=item.price_at_order
-        )
-        payment_items.append(payment_item)
-    db.add_all(payment_items)
-    await db.commit()
 
     return CheckoutSessionResponse(
         payment_url=session_data.payment_url,
@@ -136,7 +129,7 @@ async def process_order_payment_endpoint(
 
 @router.get(
     "/admin/",
-    response_model=list[OrderResponse],
+    response_model=list[OrderResponse] | list[OrderSummaryResponse],
     dependencies=[Depends(require_admin)],
 )
 async def admin_list_orders(
@@ -144,19 +137,22 @@ async def admin_list_orders(
     # when using a Pydantic model with Depends()
     filters: OrderFilterParams = Depends(),
     db: AsyncSession = Depends(get_db),
-) -> OrderModel:
+) -> list[OrderResponse] | list[OrderSummaryResponse]:
     """
-    Admin: Retrieves a list of all orders with optional filtering capabilities.
+    Admin: Retrieves a page of orders, newest first, with optional filtering capabilities.
     Filters can be applied by user ID, creation date range, and order status.
     Requires administrator privileges.
+
+    Pages are keyset-based and capped at 100 orders: pass the created_at and id of the last
+    order as after_created_at/after_id to get the next page. Pass detailed=false to get summary
+    rows with an item count instead of the items, movies and user profile.
     """
-    return await order_crud.get_all_orders(
-        db,
-        user_id=filters.user_id,
-        start_date=filters.start_date,
-        end_date=filters.end_date,
-        status=filters.status,
-    )
+    page_filters = filters.model_dump(exclude={"detailed"})
+    if filters.detailed:
+        orders = await order_crud.get_all_orders(db, **page_filters)
+        return [OrderResponse.model_validate(order, from_attributes=True) for order in orders]
+    rows = await order_crud.get_order_summaries(db, **page_filters)
+    return [OrderSummaryResponse.model_validate(row, from_attributes=True) for row in rows]
 
 
 @router.patch(
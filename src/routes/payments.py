@@ -2,13 +2,13 @@ import logging
 from datetime import datetime
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import Select, func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload, selectinload
 
 from config.dependencies import allow_roles, get_current_user, require_admin
-from crud.payments import create_payment, get_payment_by_id
+from crud.payments import create_payment, get_payment, payment_columns, payment_relations
 from database.deps import get_db
 from database.models import OrderItemModel, UserGroupEnum, UserModel
 from database.models.payments import PaymentItemModel, PaymentModel, PaymentStatus
@@ -46,7 +46,6 @@ async def create_checkout_session(
 
     payment.session_id = session_data.session_id
     await db.commit()
-    await db.refresh(payment)
 
     return CheckoutSessionResponse(
         payment_url=session_data.payment_url,
@@ -94,36 +93,76 @@ async def get_payment_link(session_id: str) -> dict:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
 
 
+async def _fetch_payment_page(
+    db: AsyncSession,
+    query: Select,
+    skip: int,
+    limit: int,
+    after_created_at: datetime | None,
+    after_id: int | None,
+    detailed: bool = True,
+) -> Response:
+    """
+    Fetch one page of a payment query ordered by (created_at, id) DESC.
+    The query selects PaymentModel entities when detailed, otherwise plain payment columns.
+    The page is validated once and serialized to JSON bytes by pydantic-core, skipping FastAPI's
+    response_model re-validation and jsonable_encoder pass.
+
+    When a cursor from the previous page is given, seek past it instead of skipping rows with OFFSET.
+    One extra row is fetched to tell whether there is a next page; when the first page already
+    holds every match, its length is the total and the COUNT query is skipped.
+    """
+    page_query = query
+    if after_created_at is not None and after_id is not None:
+        page_query = page_query.where(
+            tuple_(PaymentModel.created_at, PaymentModel.id) < tuple_(after_created_at, after_id)
+        )
+        first_page = False
+    else:
+        page_query = page_query.offset(skip)
+        first_page = skip == 0
+    result = await db.execute(page_query.limit(limit + 1))
+    rows = (result.scalars() if detailed else result).all()
+    payments, has_next = rows[:limit], len(rows) > limit
+
+    if first_page and not has_next:
+        total = len(payments)
+    else:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+
+    last = payments[-1] if has_next else None
+    page = PaymentListSchema(
+        payments=payments,
+        total=total,
+        skip=skip,
+        limit=limit,
+        next_after_created_at=last.created_at if last else None,
+        next_after_id=last.id if last else None,
+    )
+    return Response(content=page.model_dump_json(), media_type="application/json")
+
+
 @router.get("/history", response_model=PaymentListSchema)
 async def get_payment_history(
     current_user: UserModel = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-) -> PaymentListSchema:
+    after_created_at: datetime | None = None,
+    after_id: int | None = None,
+) -> Response:
     query = (
         select(PaymentModel)
         .where(PaymentModel.user_id == current_user.id)
         .options(
             selectinload(PaymentModel.payment_items).selectinload(PaymentItemModel.order_item).selectinload(
                 OrderItemModel.movie),
-            selectinload(PaymentModel.order)
+            selectinload(PaymentModel.order),
+            raiseload("*"),
         )
-        .order_by(PaymentModel.created_at.desc())
-    )
-    total = await db.scalar(select(func.count()).select_from(query.subquery()))
-
-    result = await db.execute(
-        query.offset(skip).limit(limit)
-    )
-    payments = result.scalars().all()
-
-    return PaymentListSchema(
-        payments=payments,
-        total=total,
-        skip=skip,
-        limit=limit
+        .order_by(PaymentModel.created_at.desc(), PaymentModel.id.desc())
     )
+    return await _fetch_payment_page(db, query, skip, limit, after_created_at, after_id)
 
 
 @router.get("/admin", response_model=PaymentListSchema)
@@ -136,20 +175,22 @@ async def admin_get_payments(
     end_date: datetime | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-) -> PaymentListSchema:
+    after_created_at: datetime | None = None,
+    after_id: int | None = None,
+    detailed: bool = True,
+) -> Response:
+    """
+    Admin: a page of payments, newest first, with optional filters.
+    Pass detailed=false to get the payment columns only, read as plain rows without
+    building ORM objects or loading payment items.
+    """
     if not is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access admin endpoints"
         )
 
-    query = (
-        select(PaymentModel)
-        .options(
-            selectinload(PaymentModel.payment_items),
-            selectinload(PaymentModel.order)
-        )
-    )
+    query = select(PaymentModel).options(*payment_relations()) if detailed else select(*payment_columns())
 
     if user_id:
         query = query.where(PaymentModel.user_id == user_id)
@@ -160,17 +201,8 @@ async def admin_get_payments(
     if end_date:
         query = query.where(PaymentModel.created_at <= end_date)
 
-    total = await db.scalar(select(func.count()).select_from(query.subquery()))
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    payments = result.scalars().all()
-
-    return PaymentListSchema(
-        payments=payments,
-        total=total,
-        skip=skip,
-        limit=limit
-    )
+    query = query.order_by(PaymentModel.created_at.desc(), PaymentModel.id.desc())
+    return await _fetch_payment_page(db, query, skip, limit, after_created_at, after_id, detailed)
 
 
 @router.get("/admin/statistics", response_model=PaymentStatisticsResponse)
@@ -186,26 +218,26 @@ async def get_payment_statistics(
             detail="Not authorized to access admin endpoints"
         )
 
-    query = select(PaymentModel)
-
+    # One aggregate row computed by the database; no payment rows are sent to the app
+    query = select(
+        func.coalesce(func.sum(PaymentModel.amount), 0),
+        func.count(),
+        func.count().filter(PaymentModel.status == PaymentStatus.SUCCESSFUL),
+        func.count().filter(PaymentModel.status == PaymentStatus.REFUNDED),
+    )
     if start_date:
         query = query.where(PaymentModel.created_at >= start_date)
     if end_date:
         query = query.where(PaymentModel.created_at <= end_date)
 
-    result = await db.execute(query)
-    payments = result.scalars().all()
-
-    total_amount = sum(payment.amount for payment in payments)
-    successful_payments = sum(1 for p in payments if p.status == PaymentStatus.SUCCESSFUL)
-    refunded_payments = sum(1 for p in payments if p.status == PaymentStatus.REFUNDED)
+    total_amount, total_payments, successful_payments, refunded_payments = (await db.execute(query)).one()
 
     return PaymentStatisticsResponse(
         total_amount=Decimal(total_amount),
-        total_payments=len(payments),
+        total_payments=total_payments,
         successful_payments=successful_payments,
         refunded_payments=refunded_payments,
-        success_rate=(successful_payments / len(payments)) * 100 if payments else 0
+        success_rate=(successful_payments / total_payments) * 100 if total_payments else 0
     )
 
 
@@ -214,7 +246,7 @@ async def refund_payment(
     payment_id: int,
     db: AsyncSession = Depends(get_db),
 ) -> RefundResponse:
-    payment = await get_payment_by_id(payment_id, db)
+    payment = await get_payment(payment_id, db)
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -245,7 +277,7 @@ async def get_payment_details(
     current_user: UserModel = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> PaymentBaseSchema:
-    payment = await get_payment_by_id(payment_id, db)
+    payment = await get_payment(payment_id, db)
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -3,10 +3,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.dependencies import get_current_user, require_admin
 from crud import orders as order_crud
+from crud import payments as payment_crud
 from crud import shopping_cart as cart_crud
 from database.deps import get_db
 from database.models.accounts import UserModel
-from database.models.payments import PaymentItemModel, PaymentModel, PaymentStatus
 from exceptions.shopping_cart import (
     CartNotFoundError,
     MovieAlreadyInCartError,
@@ -148,26 +148,9 @@ async def pay_for_cart(
 
     session_data = await StripeService.create_checkout_session(request, order)
 
-    payment = PaymentModel(
-        user_id=current_user.id,
-        order_id=order.id,
-        status=PaymentStatus.PENDING,
-        amount=order.total_amount,
-        session_id=session_data.session_id
+    payment = await payment_crud.create_pending_payment(
+        db, order, current_user.id, session_data.session_id
     )
-    db.add(payment)
-    await db.flush()
-
-    payment_items = []
-    for item in order.order_items:
-        payment_item = PaymentItemModel(
-            payment_id=payment.id,
-            order_item_id=item.id,
-            price_at_payment=item.price_at_order
-        )
-        payment_items.append(payment_item)
-    db.add_all(payment_items)
-    await db.commit()
 
     return CheckoutSessionResponse(
         payment_url=session_data.payment_url,
@@ -0,0 +1,20 @@
+from collections.abc import Iterable
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def json_list_response(adapter: TypeAdapter, items: Iterable[Any]) -> Response:
+    """
+    Validate a list of ORM objects (or schemas) and serialize it straight to JSON bytes.
+
+    The adapter should be built once at import time, e.g. `TypeAdapter(list[GenreReadSchema])`.
+    Serialization is done by pydantic-core in a single pass, skipping FastAPI's
+    `jsonable_encoder` + `json.dumps` round trip for list responses.
+
+    Returns:
+        Response: A JSON response with the serialized list.
+    """
+    validated = adapter.validate_python(items, from_attributes=True)
+    return Response(content=adapter.dump_json(validated), media_type="application/json")
@@ -5,7 +5,6 @@ from typing import Optional
 from pydantic import BaseModel, ConfigDict, Field
 
 from database.models.orders import OrderStatus
-from schemas.movies import MovieListItemSchema
 from schemas.profiles import ProfileResponseSchema
 
 
@@ -18,7 +17,7 @@ class OrderMovieSchema(BaseModel):
     year: int
     imdb: Optional[float]
     time: int
-    price: float
+    price: Decimal = Field(..., max_digits=10, decimal_places=2)
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -60,7 +59,32 @@ class OrderResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-class OrderFilterParams(BaseModel):
+class OrderSummaryResponse(BaseModel):
+    """
+    Pydantic schema for an order row in admin list views.
+    Carries the number of items instead of the items themselves.
+    """
+    id: int
+    user_id: int
+    created_at: datetime
+    status: OrderStatus
+    total_amount: Decimal = Field(..., max_digits=10, decimal_places=2)
+    items_count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrderPageParams(BaseModel):
+    """
+    Pydantic schema for keyset pagination of order lists (newest first).
+    Pass the created_at and id of the last order from the previous page to get the next one.
+    """
+    limit: int = Field(50, ge=1, le=100)
+    after_created_at: Optional[datetime] = None
+    after_id: Optional[int] = None
+
+
+class OrderFilterParams(OrderPageParams):
     """
     Pydantic schema for filtering orders.
     Used for query parameters in API endpoints, especially for admin views.
@@ -69,6 +93,7 @@ class OrderFilterParams(BaseModel):
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     status: Optional[OrderStatus] = None
+    detailed: bool = True
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -61,6 +61,8 @@ class PaymentListSchema(BaseModel):
     total: int
     skip: int
     limit: int
+    next_after_created_at: Optional[datetime] = None
+    next_after_id: Optional[int] = None
 
 
 class AdminPaymentFilter(BaseModel):
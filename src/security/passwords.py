@@ -34,3 +34,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         bool: True if the password is correct, False otherwise.
     """
     return pwd_context.verify(plain_password, hashed_password)
+
+
+def dummy_verify_password() -> None:
+    """
+    Spend the same time as a failed password check without a stored hash to check against.
+
+    Call this when no user matches the given credentials, so a login for an unknown email takes as
+    long as one with a wrong password and response times don't reveal which emails are registered.
+    """
+    pwd_context.dummy_verify()
@@ -1,3 +1,5 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -6,6 +8,13 @@ from jose import ExpiredSignatureError, JWTError, jwt
 from exceptions import InvalidTokenError, TokenExpiredError
 from security.interfaces import JWTAuthManagerInterface
 
+# Payloads of recently verified tokens, keyed by a digest of the token keyed with its secret,
+# so the same token is not signature-checked on every request. Entries: (cached_until, payload),
+# where cached_until never passes the token's own exp, so an expired token is always decoded again.
+_DECODED_TOKEN_CACHE_TTL_SECONDS = 60
+_DECODED_TOKEN_CACHE_MAXSIZE = 10_000
+_decoded_tokens: dict[bytes, tuple[float, dict]] = {}
+
 
 class JWTAuthManager(JWTAuthManagerInterface):
     """
@@ -48,27 +57,49 @@ class JWTAuthManager(JWTAuthManagerInterface):
             data, self._secret_key_refresh, expires_delta or timedelta(minutes=self._REFRESH_KEY_TIMEDELTA_MINUTES)
         )
 
-    def decode_access_token(self, token: str) -> dict:
-        """
-        Decode and validate an access token, returning the token's data.
-        """
+    def _decode_token(self, token: str, secret_key: str) -> dict:
+        """
+        Decode and validate a token, reusing the payload of a recent successful decode of the same token.
+        Only valid tokens are cached; invalid and expired ones raise on every call.
+        """
+        cache_key = hashlib.blake2b(
+            token.encode(), digest_size=16, key=secret_key.encode()[:64], person=self._algorithm.encode()[:16]
+        ).digest()
+        now = time.time()
+        entry = _decoded_tokens.get(cache_key)
+        if entry is not None:
+            cached_until, payload = entry
+            if now < cached_until:
+                return payload.copy()
+            del _decoded_tokens[cache_key]
+
         try:
-            return jwt.decode(token, self._secret_key_access, algorithms=[self._algorithm])
+            payload = jwt.decode(token, secret_key, algorithms=[self._algorithm])
         except ExpiredSignatureError:
             raise TokenExpiredError
         except JWTError:
             raise InvalidTokenError
 
+        expires_at = payload.get("exp")
+        if isinstance(expires_at, (int, float)) and expires_at > now:
+            if len(_decoded_tokens) >= _DECODED_TOKEN_CACHE_MAXSIZE:
+                # Evict the oldest entry; dicts keep insertion order
+                _decoded_tokens.pop(next(iter(_decoded_tokens)))
+            cached_until = min(now + _DECODED_TOKEN_CACHE_TTL_SECONDS, expires_at)
+            _decoded_tokens[cache_key] = (cached_until, payload.copy())
+        return payload
+
+    def decode_access_token(self, token: str) -> dict:
+        """
+        Decode and validate an access token, returning the token's data.
+        """
+        return self._decode_token(token, self._secret_key_access)
+
     def decode_refresh_token(self, token: str) -> dict:
         """
         Decode and validate a refresh token, returning the token's data.
         """
-        try:
-            return jwt.decode(token, self._secret_key_refresh, algorithms=[self._algorithm])
-        except ExpiredSignatureError:
-            raise TokenExpiredError
-        except JWTError:
-            raise InvalidTokenError
+        return self._decode_token(token, self._secret_key_refresh)
 
     def verify_refresh_token_or_raise(self, token: str) -> None:
         """
@@ -2,7 +2,7 @@ import logging
 from typing import Any
 
 import stripe
-from sqlalchemy import select
+from sqlalchemy import Row, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.deps import get_db_contextmanager
@@ -17,35 +17,62 @@ class PaymentWebhookService:
     """Service for handling payment webhooks and updating payment/order statuses."""
 
     @staticmethod
-    async def _get_payment_by_session_id_payment_id(payment_id: str, db: AsyncSession) -> PaymentModel:
-        payment = await db.scalar(
-            select(PaymentModel).where(
-                (PaymentModel.session_id == payment_id) |
-                (PaymentModel.payment_intent_id == payment_id)
-            )
+    async def _update_payment(
+        db: AsyncSession,
+        values: dict[str, Any],
+        session_id: str | None = None,
+        payment_intent_id: str | None = None,
+    ) -> Row:
+        """
+        Update exactly one payment with a single UPDATE and return its id, order_id and user_id.
+        The payment is matched by session_id when given, otherwise by payment_intent_id;
+        should several rows carry the same id, only the newest is updated.
+        """
+        if session_id is not None:
+            matches_payment = PaymentModel.session_id == session_id
+        else:
+            matches_payment = PaymentModel.payment_intent_id == payment_intent_id
+        payment_id = (
+            select(PaymentModel.id)
+            .where(matches_payment)
+            .order_by(PaymentModel.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(PaymentModel)
+            .where(PaymentModel.id == payment_id)
+            .values(**values)
+            .returning(PaymentModel.id, PaymentModel.order_id, PaymentModel.user_id)
         )
+        payment = result.first()
         if not payment:
-            logger.error(f"Payment not found for session_id={payment_id}")
+            logger.error(f"Payment not found for session_id={session_id}, payment_intent_id={payment_intent_id}")
             raise ValueError("Payment not found")
         return payment
 
     @staticmethod
-    async def _get_order(order_id: int, db: AsyncSession) -> OrderModel | type[OrderModel]:
-        order = await db.get(OrderModel, order_id)
-        if not order:
+    async def _update_order_status(order_id: int, new_status: OrderStatus, db: AsyncSession) -> None:
+        result = await db.execute(
+            update(OrderModel)
+            .where(OrderModel.id == order_id)
+            .values(status=new_status)
+            .returning(OrderModel.id)
+        )
+        if result.scalar_one_or_none() is None:
             logger.error(f"Order not found for order_id={order_id}")
             raise ValueError("Order not found")
-        return order
 
     async def handle_successful_session(self, session_id: str, payment_intent_id: str) -> None:
         """Handle successful session payment."""
         async with get_db_contextmanager() as db:
             try:
-                payment = await self._get_payment_by_session_id_payment_id(session_id, db)
-                payment.payment_intent_id = payment_intent_id
-                payment.status = PaymentStatus.SUCCESSFUL
-                order = await self._get_order(payment.order_id, db)
-                order.status = OrderStatus.PAID
+                payment = await self._update_payment(
+                    db,
+                    {"payment_intent_id": payment_intent_id, "status": PaymentStatus.SUCCESSFUL},
+                    session_id=session_id,
+                )
+                await self._update_order_status(payment.order_id, OrderStatus.PAID, db)
                 await db.commit()
             except Exception:
                 await db.rollback()
@@ -55,8 +82,7 @@ class PaymentWebhookService:
         """Handle expired session payment."""
         async with get_db_contextmanager() as db:
             try:
-                payment = await self._get_payment_by_session_id_payment_id(session_id, db)
-                payment.status = PaymentStatus.EXPIRED
+                await self._update_payment(db, {"status": PaymentStatus.EXPIRED}, session_id=session_id)
                 await db.commit()
             except Exception:
                 await db.rollback()
@@ -97,11 +123,11 @@ class PaymentWebhookService:
         """Handle refunded payment."""
         async with get_db_contextmanager() as db:
             try:
-                payment = await self._get_payment_by_session_id_payment_id(payment_intent_id, db)
-                payment.status = PaymentStatus.REFUNDED
+                payment = await self._update_payment(
+                    db, {"status": PaymentStatus.REFUNDED}, payment_intent_id=payment_intent_id
+                )
                 try:
-                    order = await self._get_order(payment.order_id, db)
-                    order.status = OrderStatus.CANCELED
+                    await self._update_order_status(payment.order_id, OrderStatus.CANCELED, db)
                 except ValueError:
                     logger.error(f"Order {payment.order_id} not found for payment {payment.id}")
                 await db.commit()
@@ -8,6 +8,7 @@ from config import (
     get_accounts_email_notificator,
 )
 from config.dependencies import get_dropbox_storage_client
+from crud.user_service import clear_user_group_ids
 from database.deps import get_db_contextmanager
 from database.models import CertificationModel, GenreModel, StarModel, DirectorModel
 from database.models.accounts import UserGroupEnum, UserGroupModel, UserModel
@@ -45,6 +46,7 @@ async def reset_db(request):
     the database reset is skipped to allow preserving state between end-to-end tests.
     """
     await reset_database()
+    clear_user_group_ids()
     yield
 
 
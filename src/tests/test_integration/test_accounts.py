@@ -14,6 +14,7 @@ from database.models.accounts import (
     UserGroupEnum,
     RefreshTokenModel
 )
+from exceptions import TokenExpiredError
 
 
 @pytest.fixture(autouse=True)
@@ -960,6 +961,26 @@ async def test_refresh_access_token_expired_token(client, jwt_manager):
     assert refresh_response.json()["detail"] == "Token has expired.", "Unexpected error message."
 
 
+@pytest.mark.asyncio
+async def test_decode_token_expires_after_being_cached(jwt_manager):
+    """
+    Test that a token that expires after a successful (cached) decode is rejected.
+
+    Validates that the decoded-token cache does not keep serving a token past its expiry.
+    Both the cache clock and the JWT library clock are moved past the expiry instead of sleeping.
+    """
+    token = jwt_manager.create_access_token({"user_id": 1}, expires_delta=timedelta(seconds=2))
+
+    assert jwt_manager.decode_access_token(token)["user_id"] == 1, "Fresh token should decode."
+
+    later = datetime.now(timezone.utc) + timedelta(seconds=3)
+    with patch("security.token_manager.time.time", return_value=later.timestamp()), \
+            patch("jose.jwt.datetime") as jose_datetime:
+        jose_datetime.now.return_value = later
+        with pytest.raises(TokenExpiredError):
+            jwt_manager.decode_access_token(token)
+
+
 @pytest.mark.asyncio
 async def test_refresh_access_token_token_not_found(client, jwt_manager):
     """
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models.movies import MovieModel, CertificationModel
 from database.models.accounts import UserModel
+from schemas.movies import MovieDetailSchema
 
 
 @pytest.mark.asyncio
@@ -212,6 +213,38 @@ async def test_get_movie_by_id_fields_match_database(auth_moderator_client, db_s
     assert response.status_code == 200, f"Expected status code 200, but got {response.status_code}"
 
 
+@pytest.mark.asyncio
+async def test_get_movie_by_id_json_document_matches_schema(auth_moderator_client, db_session, seed_database):
+    """
+    Test that the movie detail document built by the database has exactly the MovieDetailSchema
+    fields and the movie's own values, genres, stars and directors.
+    """
+    stmt = (
+        select(MovieModel)
+        .options(
+            joinedload(MovieModel.genres),
+            joinedload(MovieModel.stars),
+            joinedload(MovieModel.directors),
+        )
+        .limit(1)
+    )
+    movie = (await db_session.execute(stmt)).unique().scalars().first()
+    assert movie is not None, "No movies found in the database."
+
+    response = await auth_moderator_client.get(f"/api/v1/online_cinema/movies/{movie.id}/")
+    assert response.status_code == 200, f"Expected status code 200, but got {response.status_code}"
+
+    data = response.json()
+    assert set(data) == set(MovieDetailSchema.model_fields), "Movie detail keys do not match the schema."
+    assert data["id"] == movie.id
+    assert data["uuid_movie"] == str(movie.uuid_movie)
+    assert data["name"] == movie.name
+    assert data["price"] == float(movie.price)
+    assert sorted(genre["name"] for genre in data["genres"]) == sorted(genre.name for genre in movie.genres)
+    assert sorted(star["name"] for star in data["stars"]) == sorted(star.name for star in movie.stars)
+    assert sorted(d["name"] for d in data["directors"]) == sorted(d.name for d in movie.directors)
+
+
 @pytest.mark.asyncio
 async def test_create_movie_success(auth_moderator_client, seed_movie_relations):
     """
@@ -428,3 +461,26 @@ async def test_list_movies(
     assert response.status_code == 200
     data = response.json()
     assert len(data["items"]) >= 1
+
+
+@pytest.mark.asyncio
+async def test_like_and_dislike_movie_updates_counters(auth_moderator_client, db_session, seed_database):
+    """
+    Test that liking, repeating the like and switching to a dislike keeps the
+    movie's like/dislike counters consistent.
+    """
+    result = await db_session.execute(select(MovieModel).limit(1))
+    movie = result.scalars().first()
+    assert movie is not None, "No movies found in the database"
+
+    url = "/api/v1/online_cinema/movies_like/"
+
+    response = await auth_moderator_client.post(url, params={"movie_id": movie.id, "is_like": True})
+    assert response.status_code == 200, f"Expected status code 200, but got {response.status_code}"
+    assert (response.json()["total_likes"], response.json()["total_dislikes"]) == (1, 0)
+
+    response = await auth_moderator_client.post(url, params={"movie_id": movie.id, "is_like": True})
+    assert (response.json()["total_likes"], response.json()["total_dislikes"]) == (1, 0)
+
+    response = await auth_moderator_client.post(url, params={"movie_id": movie.id, "is_like": False})
+    assert (response.json()["total_likes"], response.json()["total_dislikes"]) == (0, 1)
@@ -0,0 +1,47 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models.orders import OrderModel, OrderStatus
+
+
+@pytest.mark.asyncio
+async def test_cancel_pending_order(auth_client: AsyncClient, db_session: AsyncSession, test_order: OrderModel):
+    """Test that a pending order is canceled."""
+    order_id = test_order.id
+
+    response = await auth_client.post(f"/api/v1/orders/{order_id}/cancel")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == OrderStatus.CANCELED.value
+    db_session.expire_all()
+    assert await db_session.scalar(select(OrderModel.status).where(OrderModel.id == order_id)) == OrderStatus.CANCELED
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "order_status, detail",
+    [
+        (OrderStatus.PAID, "only be canceled via refund"),
+        (OrderStatus.CANCELED, "already canceled"),
+    ],
+)
+async def test_cancel_non_pending_order_is_refused(
+    auth_client: AsyncClient,
+    db_session: AsyncSession,
+    test_order: OrderModel,
+    order_status: OrderStatus,
+    detail: str,
+):
+    """Test that a paid or canceled order is not canceled and keeps its status."""
+    test_order.status = order_status
+    await db_session.commit()
+    order_id = test_order.id
+
+    response = await auth_client.post(f"/api/v1/orders/{order_id}/cancel")
+
+    assert response.status_code == 400
+    assert detail in response.json()["detail"].lower()
+    db_session.expire_all()
+    assert await db_session.scalar(select(OrderModel.status).where(OrderModel.id == order_id)) == order_status
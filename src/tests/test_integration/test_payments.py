@@ -1,6 +1,13 @@
+from decimal import Decimal
+
 import pytest
 from httpx import AsyncClient
 from fastapi import status
+from sqlalchemy import select
+
+from database.models.orders import OrderItemModel, OrderModel, OrderStatus
+from database.models.payments import PaymentItemModel, PaymentModel, PaymentStatus
+from services.payment_webhook_service import PaymentWebhookService
 
 
 @pytest.fixture
@@ -20,6 +27,28 @@ async def test_create_payment_intent_success(auth_user_client: AsyncClient, test
     assert "session_id" in data
 
 
+@pytest.mark.asyncio
+async def test_create_payment_intent_copies_order_items(auth_user_client: AsyncClient, db_session, test_order, test_movie):
+    order_item = OrderItemModel(order_id=test_order.id, movie_id=test_movie.id, price_at_order=Decimal("7.50"))
+    db_session.add(order_item)
+    await db_session.commit()
+    order_id, order_item_id = test_order.id, order_item.id
+
+    response = await auth_user_client.post("/api/v1/payments/create-intent", json={"order_id": order_id})
+    assert response.status_code == status.HTTP_200_OK
+    payment_id = response.json()["payment_id"]
+
+    db_session.expire_all()
+    payment_items = (
+        await db_session.execute(
+            select(PaymentItemModel.order_item_id, PaymentItemModel.price_at_payment)
+            .where(PaymentItemModel.payment_id == payment_id)
+        )
+    ).all()
+    assert [tuple(item) for item in payment_items] == [(order_item_id, Decimal("7.50"))]
+    assert await db_session.scalar(select(PaymentModel.amount).where(PaymentModel.id == payment_id)) == Decimal("7.50")
+
+
 @pytest.mark.asyncio
 async def test_create_payment_intent_negative_amount(auth_user_client: AsyncClient, test_order_negative_amount):
     response = await auth_user_client.post("/api/v1/payments/create-intent", json={"order_id": test_order_negative_amount.id})
@@ -54,3 +83,34 @@ async def test_get_payment_details_unauthorized(client: AsyncClient):
 async def test_get_statistics(auth_admin_client: AsyncClient):
     response = await auth_admin_client.get("/api/v1/payments/admin/statistics")
     assert response.status_code in [status.HTTP_200_OK, status.HTTP_403_FORBIDDEN]
+
+
+@pytest.mark.asyncio
+async def test_webhook_session_completed_updates_only_the_session_payment(db_session, test_order):
+    session_payment = PaymentModel(
+        user_id=test_order.user_id, order_id=test_order.id, amount=test_order.total_amount, session_id="cs_test_1"
+    )
+    # Another payment whose payment intent id happens to equal the session id
+    other_payment = PaymentModel(
+        user_id=test_order.user_id,
+        order_id=test_order.id,
+        amount=test_order.total_amount,
+        session_id="cs_test_2",
+        payment_intent_id="cs_test_1",
+    )
+    db_session.add_all([session_payment, other_payment])
+    await db_session.commit()
+    order_id, session_payment_id, other_payment_id = test_order.id, session_payment.id, other_payment.id
+
+    await PaymentWebhookService().handle_successful_session(session_id="cs_test_1", payment_intent_id="pi_test_1")
+
+    db_session.expire_all()
+    payments = {
+        payment.id: payment
+        for payment in (await db_session.scalars(select(PaymentModel))).all()
+    }
+    assert payments[session_payment_id].status == PaymentStatus.SUCCESSFUL
+    assert payments[session_payment_id].payment_intent_id == "pi_test_1"
+    assert payments[other_payment_id].status == PaymentStatus.PENDING
+    assert payments[other_payment_id].payment_intent_id == "cs_test_1"
+    assert await db_session.scalar(select(OrderModel.status).where(OrderModel.id == order_id)) == OrderStatus.PAID